@@ -1,6 +1,11 @@
 const { useMemo, useState, useEffect, useRef } = React;
 
 // ---- Data (same as before) ---------------------------------------------------
+// How often to check on a queued HRA job
+const HRA_POLL_INTERVAL_MS = 2000;
+// Typeahead queries hit the in-memory name index, so they can be sent quickly
+const TYPEAHEAD_DEBOUNCE_MS = 150;
+
 const STEPS = ["Reentry Care Plan", "Health Risk Assessment", "Warm Handoff"];
 
 const REENTRY_SECTIONS = [
@@ -227,16 +232,44 @@ function SearchInput({ value, onChange, placeholder = "Search..." }) {
   );
 }
 
-function CandidateSelect({ list, value, onChange, placeholder = "Choose or enter a name..." }) {
+function CandidateSelect({ list, value, onChange, onSelect, remote = false, placeholder = "Choose or enter a name..." }) {
   const [isOpen, setIsOpen] = useState(false);
+  const [suggestions, setSuggestions] = useState([]);
   const containerRef = useRef(null);
 
+  // With `remote`, suggestions come from the server-side name index
+  useEffect(() => {
+    if (!remote || !value.trim()) {
+      setSuggestions([]);
+      return;
+    }
+    const controller = new AbortController();
+    const timeoutId = setTimeout(async () => {
+      try {
+        const response = await fetch(
+          `http://localhost:5000/search_candidates?q=${encodeURIComponent(value)}&k=10`,
+          { signal: controller.signal }
+        );
+        if (!response.ok) return;
+        const data = await response.json();
+        setSuggestions((data.matches || []).map((m) => ({ id: m.name, name: m.name, count: m.medical_id_count })));
+      } catch (err) {
+        if (err.name !== "AbortError") console.error("Candidate search error:", err);
+      }
+    }, TYPEAHEAD_DEBOUNCE_MS);
+    return () => {
+      clearTimeout(timeoutId);
+      controller.abort();
+    };
+  }, [remote, value]);
+
   const filtered = useMemo(() => {
+    if (remote && value) return suggestions;
     if (!value) return list.filter(c => c.id); // Show all except "Choose..."
     return list.filter((c) =>
       c.id && c.name.toLowerCase().includes(value.toLowerCase())
     );
-  }, [list, value]);
+  }, [list, value, remote, suggestions]);
 
   // Effect to handle clicks outside the component
   useEffect(() => {
@@ -260,9 +293,18 @@ function CandidateSelect({ list, value, onChange, placeholder = "Choose or enter
 
   const handleOptionClick = (candidate) => {
     onChange(candidate.name);
+    if (onSelect) onSelect(candidate.name);
     setIsOpen(false);
   };
 
+  // Enter commits whatever was typed, even if it matches no suggestion
+  const handleKeyDown = (e) => {
+    if (e.key === "Enter" && onSelect) {
+      onSelect(value);
+      setIsOpen(false);
+    }
+  };
+
   return (
     <div className="relative" ref={containerRef}>
       <div className="flex items-center rounded-xl border border-gray-300 bg-white px-3 shadow focus-within:ring-2 focus-within:ring-emerald-500">
@@ -273,6 +315,7 @@ function CandidateSelect({ list, value, onChange, placeholder = "Choose or enter
           value={value}
           onChange={handleInputChange}
           onFocus={() => setIsOpen(true)}
+          onKeyDown={handleKeyDown}
           placeholder={placeholder}
           className="w-full bg-transparent p-2 text-sm outline-none"
         />
@@ -293,6 +336,7 @@ function CandidateSelect({ list, value, onChange, placeholder = "Choose or enter
                 className="w-full rounded-lg px-3 py-2 text-left text-sm hover:bg-emerald-50"
               >
                 {c.name}
+                {c.count > 1 && <span className="ml-2 text-xs text-gray-400">{c.count} profiles</span>}
               </button>
             )) : (
               <div className="px-3 py-2 text-sm text-gray-500">No matches found. Your entry will be saved.</div>
@@ -359,6 +403,8 @@ function ReentryCarePlanUI() {
   const [activeStep, setActiveStep] = useState(0);
   const [assessmentType, setAssessmentType] = useState("");
   const [candidateName, setCandidateName] = useState('');
+  // Name the user picked from the typeahead; profiles are only fetched for it
+  const [pickedName, setPickedName] = useState('');
   const [candidateProfiles, setCandidateProfiles] = useState([]);
   const [selectedProfile, setSelectedProfile] = useState('');
   const [loadingProfiles, setLoadingProfiles] = useState(false);
@@ -409,6 +455,7 @@ function ReentryCarePlanUI() {
   // Reset fields on step/type change
   useEffect(() => {
     setCandidateName("");
+    setPickedName("");
     setCandidateProfiles([]);
     setSelectedProfile("");
   }, [activeStep, assessmentType]);
@@ -433,6 +480,16 @@ function ReentryCarePlanUI() {
   const toggleAll = (next) => setChecked(Object.fromEntries(allFieldIds.map((id) => [id, next])));
   const toggle = (id) => setChecked((prev) => ({ ...prev, [id]: !prev[id] }));
 
+  // Typing invalidates the previous pick; picking a match triggers the profile fetch
+  const handleCandidateInput = (value) => {
+    setCandidateName(value);
+    setPickedName("");
+  };
+  const handleCandidatePick = (name) => {
+    setCandidateName(name);
+    setPickedName(name.trim());
+  };
+
   // Handle profile selection - update candidate name when profile is selected
   const handleProfileSelection = (medicalId) => {
     setSelectedProfile(medicalId);
@@ -500,15 +557,11 @@ useEffect(() => {
     }
   };
 
-  // Immediate check/fetch on mount or dependency change (activeStep, candidateName)
-  // We use a timeout for debouncing to prevent excessive API calls while typing.
-  const timeoutId = setTimeout(() => {
-    fetchCandidates(candidateName);
-  }, 500);
-
-  return () => clearTimeout(timeoutId);
+  // The per-candidate merge is expensive, so it only runs once a name is picked
+  // from the typeahead (or committed with Enter), not on every keystroke.
+  fetchCandidates(pickedName);
 
-}, [candidateName, activeStep]);
+}, [pickedName, activeStep]);
 // New useEffect hook - END
 
   async function generate(reportType) {
@@ -549,6 +602,7 @@ useEffect(() => {
       
       let endpoint = "";
       let filename = "";
+      let hraKind = null;
       
       if (reportType === "reentry_care_plan") {
         endpoint = "http://localhost:5000/generate_reentry_care_plan";
@@ -557,31 +611,40 @@ useEffect(() => {
         endpoint = "http://localhost:5000/generate_data_validation_report";
         filename = `${finalCandidateForBackend}_data_validation_report.docx`;
       } else if (reportType === "Adult_Receiving_Screening") {
-        endpoint = "http://localhost:5000/generate_hra_adult";
+        hraKind = "adult";
         filename = `${finalCandidateForBackend}_adult_hra.docx`;
       } else if (reportType === "Juvenile_MH_Screening") {
-        endpoint = "http://localhost:5000/generate_hra_juvenile";
+        hraKind = "juvenile";
         filename = `${finalCandidateForBackend}_juvenile_hra.docx`;
       } else {
         setError("Invalid report type specified.");
         return;
       }
 
-      const response = await fetch(endpoint, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          selected_fields: selectedFields,
-          candidate_name: finalCandidateForBackend,
-          app_option: reportType,
-        }),
-      });
+      // HRAs run as background jobs: enqueue, poll until finished, then download
+      const response = hraKind
+        ? await runHraJob(hraKind, selectedFields, finalCandidateForBackend)
+        : await fetch(endpoint, {
+            method: "POST",
+            headers: { "Content-Type": "application/json", "X-Server-Timing": "1" },
+            body: JSON.stringify({
+              selected_fields: selectedFields,
+              candidate_name: finalCandidateForBackend,
+              app_option: reportType,
+            }),
+          });
 
       if (!response.ok) {
         const errorData = await response.json().catch(() => ({ error: `Server error: ${response.status}` }));
         throw new Error(errorData.error || `Server error: ${response.status}`);
       }
 
+      const timing = response.headers.get("Server-Timing");
+      if (timing) {
+        // e.g. "sql;dur=41.2, bigquery;dur=180.5, document_build;dur=22.0, total;dur=230.1"
+        console.info(`Server timing for ${filename}: ${timing}`);
+      }
+
       const blob = await response.blob();
       const url = window.URL.createObjectURL(blob);
       
@@ -597,6 +660,27 @@ useEffect(() => {
     }
   }
   
+  async function runHraJob(kind, fields, candidate) {
+    const submit = await fetch("http://localhost:5000/jobs/hra", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ kind, selected_fields: fields, candidate_name: candidate }),
+    });
+    if (!submit.ok) {
+      return submit;
+    }
+    let job = await submit.json();
+    while (!["succeeded", "failed", "cancelled", "timed_out"].includes(job.status)) {
+      await new Promise((resolve) => setTimeout(resolve, HRA_POLL_INTERVAL_MS));
+      const status = await fetch(`http://localhost:5000${job.status_url}`);
+      if (!status.ok) {
+        return status;
+      }
+      job = await status.json();
+    }
+    return fetch(`http://localhost:5000${job.result_url}`);
+  }
+  
   function downloadFile() {
     if (!documentUrl || !documentName) {
       setError("No document is ready for download.");
@@ -692,7 +776,13 @@ useEffect(() => {
             <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
               <div>
                 <label className="mb-2 block text-sm font-medium text-gray-700">Candidate</label>
-                <CandidateSelect list={candidatePool} value={candidateName} onChange={setCandidateName} />
+                <CandidateSelect
+                  list={candidatePool}
+                  value={candidateName}
+                  onChange={handleCandidateInput}
+                  onSelect={handleCandidatePick}
+                  remote
+                />
                 {loadingProfiles && (
                   <div className="flex items-center gap-2 mt-2 px-3 py-1 text-sm text-gray-500">
                     <svg className="animate-spin h-4 w-4" xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24">
@@ -723,7 +813,7 @@ useEffect(() => {
                   </select>
                 </div>
               )}
-              {candidateName.trim() && !loadingProfiles && candidateProfiles.length === 0 && (
+              {pickedName && !loadingProfiles && candidateProfiles.length === 0 && (
                 <div>
                   <label className="mb-2 block text-sm font-medium text-gray-700">Profile Status</label>
                   <div className="w-full rounded-xl border border-gray-200 bg-gray-50 px-3 py-2 text-gray-600">
@@ -1,11 +1,32 @@
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory, stream_with_context
 from flask_cors import CORS
 import io
+import logging
 import os
-import shutil
-from src.model import openai_model_with_mcp_tools
-from src.reentry_care_plan import generate_reentry_care_plan, get_candidates_by_name, generate_data_validation_report
-from src.reentry_care_plan import read_cloud_sql, read_bigquery, normalize_columns
+import uuid
+import hashlib
+import json
+import mimetypes
+import multiprocessing
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.utils import secure_filename
+from src.reentry_care_plan import generate_reentry_care_plan, get_candidate_profiles, generate_data_validation_report
+from src.reentry_care_plan import warm_up, check_readiness
+from src.reentry_care_plan import get_sql_pool_stats, fetch_source_records, merge_source_records
+from src.reentry_care_plan import record_cache, invalidate_cached_records, bigquery_access
+from src.reentry_care_plan import snapshot_store, serving_from_snapshot
+from src.reentry_care_plan import fetch_source_records_many, render_report_bytes, get_case_notes, render_cache
+from src.reentry_care_plan import search_index, singleflight_stats
+from src.jobs import JobQueue, SUCCEEDED, FINISHED_STATES
+from src.hra_output import MemorySink, OutputSweeper, run_hra_model, HRA_OUTPUT_ROOT
+from src.tracing import start_request, request_spans, server_timing, render_metrics, request_latency, stage_latency
+from src.logging_setup import configure_logging, set_request_id, get_request_id
+from src.assets import AssetPipeline, choose_variant
+from src.completeness import cached_completeness
 from dotenv import load_dotenv
 import pandas as pd
 import re
@@ -13,20 +34,98 @@ import re
 # Load environment variables
 load_dotenv()
 
+# Structured JSON logs written from a background thread (see src/logging_setup.py)
+configure_logging()
+logger = logging.getLogger('serrano.app')
+
 # Create Flask app with static folder for frontend
 app = Flask(__name__, static_folder='frontend', static_url_path='')
-CORS(app)
+CORS(app, expose_headers=['Server-Timing'])
+
+# Per-request timing: every request is timed by endpoint, and stage spans
+# (source reads, template load, document build/save) are summed into a
+# Server-Timing header when SERVER_TIMING=true or the client sends
+# "X-Server-Timing: 1".
+SERVER_TIMING = os.environ.get('SERVER_TIMING', 'false').lower() in ('1', 'true', 'yes')
+
+@app.before_request
+def begin_request_timing():
+    start_request()
+    set_request_id(request.headers.get('X-Request-ID') or uuid.uuid4().hex)
+    request.environ['serrano.started'] = time.perf_counter()
+
+@app.after_request
+def finish_request_timing(response):
+    started = request.environ.get('serrano.started')
+    if started is None:
+        return response
+    handled = time.perf_counter()
+    request_latency.observe(request.endpoint or 'unmatched', handled - started)
+    logger.info("request", extra={
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'duration_ms': round((handled - started) * 1000, 1),
+    })
+    response.headers['X-Request-ID'] = get_request_id()
+    if SERVER_TIMING or request.headers.get('X-Server-Timing') == '1':
+        spans = request_spans() + [('total', handled - started)]
+        response.headers['Server-Timing'] = server_timing(spans)
+        response.headers['Timing-Allow-Origin'] = '*'
+    # Sending the body happens after this hook; time it until the response is closed
+    response.call_on_close(lambda: stage_latency.observe('response_send', time.perf_counter() - handled))
+    return response
+
+# Prometheus scrape endpoint
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Stage and endpoint latency histograms in Prometheus text format"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+# Frontend assets: a transpiled, minified, content-hashed bundle (see
+# src/assets.py) served with precompressed variants. Hashed files are cached
+# for a year; index.html and unhashed files are revalidated by ETag.
+asset_pipeline = AssetPipeline(app.static_folder)
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Unhashed static files (styles.css in development, images) are revalidated after this
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = int(os.environ.get('STATIC_MAX_AGE', '300'))
+
+def send_asset(directory, filename, immutable=False):
+    """Send a frontend file, preferring a precompressed variant the client accepts"""
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    variant, encoding = choose_variant(directory, filename, lambda e: request.accept_encodings[e] > 0)
+    response = send_from_directory(
+        directory, variant, mimetype=mimetype, conditional=True, etag=True,
+        max_age=IMMUTABLE_MAX_AGE if immutable else 0,
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    if immutable:
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
 
 # Serve frontend files
 @app.route('/')
 def serve_frontend():
-    """Serve the main HTML file"""
-    return send_from_directory(app.static_folder, 'index.html')
+    """Serve the main HTML file (the built one when a bundle is available)"""
+    if asset_pipeline.manifest():
+        return send_asset(asset_pipeline.build_dir, 'index.html')
+    return send_asset(app.static_folder, 'index.html')
 
 @app.route('/app.js')
 def serve_js():
-    """Serve the JavaScript file"""
-    return send_from_directory(app.static_folder, 'app.js')
+    """Serve the JSX source, for development without a bundle"""
+    return send_asset(app.static_folder, 'app.js')
+
+@app.route('/assets/<path:filename>')
+def serve_bundle(filename):
+    """Serve a content-hashed bundle file"""
+    if not asset_pipeline.is_bundle_file(filename):
+        return jsonify({'error': 'Asset not found'}), 404
+    return send_asset(asset_pipeline.build_dir, filename, immutable=True)
 
 # Serve image files
 @app.route('/image/<path:filename>')
@@ -37,12 +136,97 @@ def serve_images(filename):
     except FileNotFoundError:
         return jsonify({'error': 'Image not found'}), 404
 
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Generated reports are streamed from memory; set ARCHIVE_REPORTS=true (or
+# pass "archive": true in the request) to also keep a copy on disk. Archived
+# files are named by an opaque ID, never by the youth's name or Medical ID.
+ARCHIVE_REPORTS = os.environ.get('ARCHIVE_REPORTS', 'false').lower() in ('1', 'true', 'yes')
+REPORT_ARCHIVE_DIR = os.environ.get('REPORT_ARCHIVE_DIR', 'data/archive')
+
+def archive_document(data, report_type):
+    """Write a generated document to a per-request unique path and return its archive ID"""
+    os.makedirs(REPORT_ARCHIVE_DIR, exist_ok=True)
+    archive_id = uuid.uuid4().hex
+    path = os.path.join(REPORT_ARCHIVE_DIR, f"{archive_id}_{secure_filename(report_type)}.docx")
+    with open(path, 'wb') as f:
+        f.write(data)
+    return archive_id
+
+def docx_response(doc_io, filename, report_type, archive=False):
+    """Send an in-memory .docx with Content-Length and a content ETag"""
+    data = doc_io.getbuffer()
+    etag = hashlib.sha1(data).hexdigest()
+    if archive or ARCHIVE_REPORTS:
+        archive_id = archive_document(data, report_type)
+        logger.info("🗄️ Archived report", extra={'archive_id': archive_id, 'report_type': report_type})
+    del data  # release the buffer export so send_file can read doc_io
+    doc_io.seek(0)
+    return send_file(
+        doc_io,
+        as_attachment=True,
+        download_name=filename,
+        mimetype=DOCX_MIMETYPE,
+        etag=etag,
+        conditional=True,
+        max_age=0
+    )
+
 # Health check endpoint
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({'status': 'healthy', 'message': 'Backend is running'})
 
+# Readiness endpoint: 200 once dependencies are reachable, 503 otherwise
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness check for load balancers and orchestrators"""
+    ready, checks = check_readiness()
+    return jsonify({'ready': ready, 'checks': checks}), (200 if ready else 503)
+
+def load_hra_model():
+    """Import the HRA model (OpenAI + MCP clients) on first use, not at startup."""
+    from src.model import openai_model_with_mcp_tools
+    return openai_model_with_mcp_tools
+
+def generate_hra_bytes(selected_fields, candidate_name, model=None):
+    """Run the HRA model into a per-call in-memory sink and return the .docx bytes"""
+    return run_hra_model(model or load_hra_model(), selected_fields, candidate_name, MemorySink())
+
+# Cloud SQL connection pool statistics
+@app.route('/sql_pool_stats', methods=['GET'])
+def sql_pool_stats():
+    """Report checked-out connections, overflow and checkout wait time"""
+    return jsonify(get_sql_pool_stats())
+
+# Merged record cache statistics
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Report record cache, rendered document cache, single-flight and BigQuery cache/latency/bytes metrics"""
+    return jsonify({
+        'records': record_cache.stats(),
+        'documents': render_cache.stats(),
+        'singleflight': singleflight_stats(),
+        'bigquery': bigquery_access.metrics(),
+    })
+
+# Force a refresh of cached records after a case manager edits them
+@app.route('/cache/invalidate', methods=['POST'])
+def cache_invalidate():
+    """Invalidate one Medical ID (or all records when none is given)"""
+    data = request.get_json(silent=True) or {}
+    medical_id = str(data.get('medical_id', '')).strip() or None
+    removed = invalidate_cached_records(medical_id)
+    return jsonify({'success': True, 'medical_id': medical_id, 'invalidated': removed})
+
+# Local snapshot status
+@app.route('/snapshot', methods=['GET'])
+def snapshot_status():
+    """Report whether lookups are served from the local snapshot"""
+    info = snapshot_store.info() if snapshot_store.available() else None
+    return jsonify({'serving_from_snapshot': serving_from_snapshot(), 'snapshot': info})
+
 # Helper function to get merged data from all sources
 def get_merged_data(name, medical_id):
     """
@@ -50,52 +234,83 @@ def get_merged_data(name, medical_id):
     Returns a dictionary of the merged data.
     """
     try:
-        file_data = pd.read_excel("ExcelFiles/reentry5.xlsx")
-        file_data = normalize_columns(file_data)
-        
-        if "Medical ID Number" in file_data.columns:
-            excel_row = file_data[file_data["Medical ID Number"].astype(str) == medical_id]
-            excel_dict = excel_row.to_dict(orient="records")[0] if not excel_row.empty else {}
-        else:
-            excel_dict = {}
-        
-        sql_record = read_cloud_sql(name, medical_id)
-        sql_record = normalize_columns(sql_record)
-        sql_dict = sql_record.to_dict(orient="records")[0] if not sql_record.empty else {}
-
-        bq_record = read_bigquery(name, medical_id)
-        bq_record = normalize_columns(bq_record)
-        bq_dict = bq_record.to_dict(orient="records")[0] if not bq_record.empty else {}
-
-        merged_dict = {**excel_dict, **sql_dict, **bq_dict}
-        return merged_dict
+        records, unavailable = fetch_source_records(name, medical_id)
+        if unavailable:
+            logger.warning("⚠️ Merged data is missing sources", extra={'medical_id': medical_id, 'unavailable': unavailable})
+        return merge_source_records(records, medical_id)
     except Exception as e:
-        print(f"Error retrieving merged data for candidate: {e}")
+        logger.exception("Error retrieving merged data for candidate")
         return {}
 
+# Roster-wide data completeness (all youths, all three sources merged)
+COMPLETENESS_MAX_AGE = float(os.environ.get('COMPLETENESS_MAX_AGE', '300'))
+COMPLETENESS_EXPORTS = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+
+@app.route('/data_completeness', methods=['GET'])
+def data_completeness():
+    """Per-field and per-source coverage; ?format=csv or parquet downloads the missing-data list"""
+    fmt = request.args.get('format', 'json').lower()
+    if fmt != 'json' and fmt not in COMPLETENESS_EXPORTS:
+        return jsonify({'error': f"format must be json or one of {sorted(COMPLETENESS_EXPORTS)}"}), 400
+    try:
+        summary, missing = cached_completeness(COMPLETENESS_MAX_AGE)
+    except Exception as e:
+        logger.exception("Error computing data completeness")
+        return jsonify({'error': str(e)}), 500
+    if fmt == 'json':
+        return jsonify(summary)
+
+    buffer = io.BytesIO()
+    if fmt == 'parquet':
+        missing.to_parquet(buffer, index=False)
+    else:
+        buffer.write(missing.to_csv(index=False).encode('utf-8'))
+    buffer.seek(0)
+    return send_file(buffer, as_attachment=True, download_name=f"missing_data.{fmt}", mimetype=COMPLETENESS_EXPORTS[fmt])
+
+# Typeahead search over the in-memory name index (no source queries)
+SEARCH_MAX_RESULTS = 50
+
+@app.route('/search_candidates', methods=['GET'])
+def search_candidates_endpoint():
+    """Top-k youth names matching ?q= by prefix and trigram similarity"""
+    query = request.args.get('q', '').strip()
+    try:
+        k = min(max(int(request.args.get('k', 10)), 1), SEARCH_MAX_RESULTS)
+    except ValueError:
+        return jsonify({'error': 'k must be an integer'}), 400
+    started = time.perf_counter()
+    matches = search_index.search(query, k) if query else []
+    return jsonify({
+        'query': query,
+        'matches': matches,
+        'took_ms': round((time.perf_counter() - started) * 1000, 3),
+        'index': search_index.info(),
+    })
+
 # Get candidates by name endpoint
 @app.route('/get_candidates_by_name', methods=['POST'])
 def get_candidates_endpoint():
     """Get all candidate profiles for a given name"""
-    print("\n=== GET_CANDIDATES_BY_NAME ENDPOINT ===")
     try:
         data = request.get_json()
-        print(f"📥 INPUT: {data}")
         candidate_name = data.get('candidate_name', '').strip()
 
         if not candidate_name:
-            print("❌ ERROR: No candidate name provided")
+            logger.info("❌ No candidate name provided")
             return jsonify({'error': 'Candidate name is required'}), 400
 
-        print(f"🔍 SEARCHING for candidates with name: '{candidate_name}'")
-
-        print("🔧 CALLING get_candidates_by_name()...")
-        candidates = get_candidates_by_name(candidate_name)
-        print(f"📊 FOUND {len(candidates)} candidates: {candidates}")
+        candidates = get_candidate_profiles(candidate_name)
+        logger.info("📊 Candidates found", extra={'count': len(candidates)})
+        logger.debug("Candidate search payload", extra={
+            'query': candidate_name,
+            'candidates': [(c['name'], c['medical_id']) for c in candidates],
+        })
 
         profiles = []
-        for name, medical_id in candidates:
-            merged_data = get_merged_data(name, medical_id)
+        for candidate in candidates:
+            name, medical_id = candidate["name"], candidate["medical_id"]
+            merged_data = candidate["record"]
             address = merged_data.get("Residential Address", "N/A")
             phone_number = merged_data.get("Telephone", "N/A")
 
@@ -112,118 +327,248 @@ def get_candidates_endpoint():
             'candidates': profiles,
             'count': len(profiles)
         }
-        print(f"📤 OUTPUT: {result}")
         return jsonify(result)
 
     except Exception as e:
-        print(f"❌ ERROR in get_candidates_endpoint: {e}")
+        logger.exception("❌ ERROR in get_candidates_endpoint")
         return jsonify({'error': str(e)}), 500
-    finally:
-        print("=== END GET_CANDIDATES_BY_NAME ===")
 
 
 # Reentry Care Plan endpoint
 @app.route('/generate_reentry_care_plan', methods=['POST'])
 def generate_reentry_endpoint():
     """Handle Reentry Care Plan generation"""
-    print("\n=== GENERATE_REENTRY_CARE_PLAN ENDPOINT ===")
     try:
         data = request.get_json()
-        print(f"📥 INPUT: {data}")
         selected_fields = data.get('selected_fields', [])
         candidate_name = data.get('candidate_name', '')
         app_option = data.get('app_option', 'reentry_care_plan')
 
         if not candidate_name:
-            print("❌ ERROR: No candidate name provided")
+            logger.info("❌ No candidate name provided")
             return jsonify({'error': 'Candidate name is required'}), 400
 
         if not selected_fields:
-            print("❌ ERROR: No fields selected")
+            logger.info("❌ No fields selected")
             return jsonify({'error': 'At least one field must be selected'}), 400
 
-        print(f"🏗️ GENERATING Reentry Care Plan for '{candidate_name}'")
-        print(f"📋 SELECTED FIELDS ({len(selected_fields)}): {selected_fields}")
-
-        print("🔧 CALLING generate_reentry_care_plan()...")
+        logger.debug("Reentry Care Plan request payload", extra={'candidate_name': candidate_name, 'selected_fields': selected_fields})
         doc_io = generate_reentry_care_plan(selected_fields, candidate_name, app_option)
 
         if doc_io is None:
-            print("❌ ERROR: Document generation failed")
+            logger.error("❌ Reentry Care Plan generation failed")
             return jsonify({'error': 'Failed to generate care plan'}), 500
 
-        print("📄 DOCUMENT generated successfully")
-
-        output_path = "data/reentry_output.docx"
-        with open(output_path, 'wb') as f:
-            f.write(doc_io.getvalue())
-
         filename = f"{candidate_name}_reentry_care_plan.docx"
-        print(f"📤 SENDING FILE: {filename}")
-        return send_file(
-            output_path,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-        )
+        logger.info("📄 Reentry Care Plan generated", extra={'selected_fields': len(selected_fields)})
+        return docx_response(doc_io, filename, 'reentry_care_plan', archive=data.get('archive', False))
 
     except Exception as e:
-        print(f"❌ ERROR in reentry endpoint: {e}")
+        logger.exception("❌ ERROR in reentry endpoint")
         return jsonify({'error': str(e)}), 500
-    finally:
-        print("=== END GENERATE_REENTRY_CARE_PLAN ===")
 
 
 # Data Validation Report endpoint
 @app.route('/generate_data_validation_report', methods=['POST'])
 def generate_validation_endpoint():
     """Handle Data Validation Report generation"""
-    print("\n=== GENERATE_DATA_VALIDATION_REPORT ENDPOINT ===")
     try:
         data = request.get_json()
-        print(f"📥 INPUT: {data}")
         selected_fields = data.get('selected_fields', [])
         candidate_name = data.get('candidate_name', '')
         app_option = data.get('app_option', 'data_validation_report')
 
         if not candidate_name:
-            print("❌ ERROR: No candidate name provided")
+            logger.info("❌ No candidate name provided")
             return jsonify({'error': 'Candidate name is required'}), 400
 
         if not selected_fields:
-            print("❌ ERROR: No fields selected")
+            logger.info("❌ No fields selected")
             return jsonify({'error': 'At least one field must be selected'}), 400
 
-        print(f"🏗️ GENERATING Data Validation Report for '{candidate_name}'")
-        print(f"📋 SELECTED FIELDS ({len(selected_fields)}): {selected_fields}")
-
-        print("🔧 CALLING generate_data_validation_report()...")
+        logger.debug("Data Validation Report request payload", extra={'candidate_name': candidate_name, 'selected_fields': selected_fields})
         doc_io = generate_data_validation_report(selected_fields, candidate_name, app_option)
 
         if doc_io is None:
-            print("❌ ERROR: Document generation failed")
+            logger.error("❌ Data Validation Report generation failed")
             return jsonify({'error': 'Failed to generate validation report'}), 500
 
-        print("📄 DOCUMENT generated successfully")
-
-        output_path = "data/validation_output.docx"
-        with open(output_path, 'wb') as f:
-            f.write(doc_io.getvalue())
-        
         filename = f"{candidate_name}_data_validation_report.docx"
-        print(f"📤 SENDING FILE: {filename}")
-        return send_file(
-            output_path,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+        logger.info("📄 Data Validation Report generated", extra={'selected_fields': len(selected_fields)})
+        return docx_response(doc_io, filename, 'data_validation_report', archive=data.get('archive', False))
+
+    except Exception as e:
+        logger.exception("❌ ERROR in validation endpoint")
+        return jsonify({'error': str(e)}), 500
+
+
+# Batch report generation
+BATCH_MAX_CANDIDATES = int(os.environ.get('BATCH_MAX_CANDIDATES', '200'))
+# Seconds a batch may spend rendering; documents still unfinished after that
+# are reported as timed out in the manifest
+BATCH_RENDER_TIMEOUT = float(os.environ.get('BATCH_RENDER_TIMEOUT', '300'))
+BATCH_REPORT_TYPES = ('reentry_care_plan', 'data_validation_report')
+
+def default_render_processes(serving_processes=1):
+    """Render processes per serving process, so all of them together use about one per core"""
+    return max(1, (os.cpu_count() or 2) // max(1, serving_processes))
+
+# gunicorn.conf.py lowers the default to account for its worker count
+BATCH_RENDER_PROCESSES = int(os.environ.get('BATCH_RENDER_PROCESSES', '0')) or default_render_processes()
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+def _render_pool_context():
+    # The pool is created lazily inside a multithreaded worker, where forking
+    # could copy a lock some other thread holds; forkserver children fork from
+    # a clean single-threaded server instead (spawn where that is unavailable)
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['src.reentry_care_plan'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+def get_render_pool():
+    """Process pool that renders batch documents off the request threads"""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(max_workers=BATCH_RENDER_PROCESSES, mp_context=_render_pool_context())
+    return _render_pool
+
+def retire_render_pool(pool, terminate=False):
+    """
+    Stop handing out `pool` (broken, or stuck on a hung render) so the next
+    batch gets a fresh one. With `terminate`, its processes are killed too,
+    which fails whatever other batches still had running on it.
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    processes = list((getattr(pool, '_processes', None) or {}).values()) if terminate else []
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+class ZipChunkStream:
+    """Write-only file object that hands zip output to a streaming response"""
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+@app.route('/generate_batch', methods=['POST'])
+def generate_batch_endpoint():
+    """Render one report per Medical ID and stream them back as a ZIP with a manifest"""
+    try:
+        data = request.get_json()
+        medical_ids = [str(mid).strip() for mid in data.get('medical_ids', []) if str(mid).strip()]
+        medical_ids = list(dict.fromkeys(medical_ids))
+        selected_fields = data.get('selected_fields', [])
+        report_type = data.get('report_type', 'reentry_care_plan')
+
+        if not medical_ids:
+            return jsonify({'error': 'At least one Medical ID is required'}), 400
+        if len(medical_ids) > BATCH_MAX_CANDIDATES:
+            return jsonify({'error': f'At most {BATCH_MAX_CANDIDATES} Medical IDs per batch'}), 400
+        if not selected_fields:
+            return jsonify({'error': 'At least one field must be selected'}), 400
+        if report_type not in BATCH_REPORT_TYPES:
+            return jsonify({'error': f'report_type must be one of {list(BATCH_REPORT_TYPES)}'}), 400
+
+        logger.info("🏗️ Batch started", extra={'report_type': report_type, 'requested': len(medical_ids)})
+        records_by_id, unavailable = fetch_source_records_many(medical_ids)
+
+        manifest = {
+            'report_type': report_type,
+            'requested': len(medical_ids),
+            'unavailable_sources': unavailable,
+            'documents': []
+        }
+        pool = get_render_pool()
+        futures = {}
+        for medical_id in medical_ids:
+            records = records_by_id.get(medical_id, {})
+            merged_dict = merge_source_records(records, medical_id)
+            name = merged_dict.get('Name of the youth') or medical_id
+            if not any(records.values()):
+                manifest['documents'].append({
+                    'medical_id': medical_id, 'status': 'error', 'error': 'No records found in any source'
+                })
+                continue
+            notes_value = get_case_notes(records.get('sql', {}), records.get('bigquery', {}), records.get('excel', {}))
+            args = (render_report_bytes, report_type, str(name), merged_dict, selected_fields, notes_value)
+            try:
+                future = pool.submit(*args)
+            except BrokenProcessPool:
+                # A render process died (e.g. OOM-killed) earlier; start over with a fresh pool
+                retire_render_pool(pool)
+                pool = get_render_pool()
+                future = pool.submit(*args)
+            futures[future] = {
+                'medical_id': medical_id,
+                'name': str(name),
+                'filename': secure_filename(f"{name}_{medical_id}_{report_type}.docx")
+            }
+
+        def generate():
+            stream = ZipChunkStream()
+            pending = set(futures)
+            with zipfile.ZipFile(stream, 'w') as zf:
+                try:
+                    for future in as_completed(futures, timeout=BATCH_RENDER_TIMEOUT):
+                        pending.discard(future)
+                        entry = dict(futures[future])
+                        try:
+                            # .docx files are already deflated; store them as-is
+                            zf.writestr(entry['filename'], future.result(), compress_type=zipfile.ZIP_STORED)
+                            entry['status'] = 'ok'
+                        except Exception as e:
+                            if isinstance(e, BrokenProcessPool):
+                                retire_render_pool(pool)
+                            logger.error("❌ Batch render failed", extra={'medical_id': entry['medical_id'], 'error': str(e)})
+                            entry.pop('filename')
+                            entry.update({'status': 'error', 'error': str(e)})
+                        manifest['documents'].append(entry)
+                        chunk = stream.drain()
+                        if chunk:
+                            yield chunk
+                except FuturesTimeout:
+                    logger.error("❌ Batch render timed out", extra={'unfinished': len(pending), 'timeout': BATCH_RENDER_TIMEOUT})
+                    # A hung render would otherwise hold a pool process for good
+                    retire_render_pool(pool, terminate=True)
+                    for future in pending:
+                        entry = dict(futures[future])
+                        entry.pop('filename')
+                        entry.update({'status': 'timed_out', 'error': f'not rendered within {BATCH_RENDER_TIMEOUT:.0f}s'})
+                        manifest['documents'].append(entry)
+                manifest['succeeded'] = sum(1 for d in manifest['documents'] if d['status'] == 'ok')
+                zf.writestr('manifest.json', json.dumps(manifest, indent=2, default=str),
+                            compress_type=zipfile.ZIP_DEFLATED)
+            yield stream.drain()
+            logger.info("📤 Batch streamed", extra={'succeeded': manifest['succeeded'], 'requested': len(medical_ids)})
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename="{report_type}_batch.zip"'}
         )
 
     except Exception as e:
-        print(f"❌ ERROR in validation endpoint: {e}")
+        logger.exception("❌ ERROR in batch endpoint")
         return jsonify({'error': str(e)}), 500
-    finally:
-        print("=== END GENERATE_DATA_VALIDATION_REPORT ===")
 
 
 # Adult Health Risk Assessment endpoint
@@ -241,29 +586,17 @@ def generate_hra_adult_endpoint():
         if not selected_fields:
             return jsonify({'error': 'At least one field must be selected'}), 400
 
-        print(f"Generating Adult HRA for {candidate_name} with fields: {selected_fields}")
-
-        result = openai_model_with_mcp_tools(selected_fields, candidate_name)
+        logger.debug("Adult HRA request payload", extra={'candidate_name': candidate_name, 'selected_fields': selected_fields})
 
-        if isinstance(result, dict):
-            output_path = "data/output.docx"
-            if not os.path.exists(output_path):
-                return jsonify({'error': 'Document generation failed - output file not created'}), 500
+        try:
+            data = generate_hra_bytes(selected_fields, candidate_name)
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 500
 
-            final_path = f"data/{candidate_name}_adult_hra.docx"
-            shutil.copy(output_path, final_path)
-
-            return send_file(
-                final_path,
-                as_attachment=True,
-                download_name=f"{candidate_name}_adult_hra.docx",
-                mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            )
-        else:
-            return jsonify({'error': f'Failed to generate HRA: {result}'}), 500
+        return docx_response(io.BytesIO(data), f"{candidate_name}_adult_hra.docx", 'adult_hra')
 
     except Exception as e:
-        print(f"Error in adult HRA endpoint: {e}")
+        logger.exception("Error in adult HRA endpoint")
         return jsonify({'error': str(e)}), 500
 
 # Juvenile Health Risk Assessment endpoint
@@ -281,44 +614,180 @@ def generate_hra_juvenile_endpoint():
         if not selected_fields:
             return jsonify({'error': 'At least one field must be selected'}), 400
 
-        print(f"Generating Juvenile HRA for {candidate_name} with fields: {selected_fields}")
-
-        result = openai_model_with_mcp_tools(selected_fields, candidate_name)
+        logger.debug("Juvenile HRA request payload", extra={'candidate_name': candidate_name, 'selected_fields': selected_fields})
 
-        if isinstance(result, dict):
-            output_path = "data/output.docx"
-            if not os.path.exists(output_path):
-                return jsonify({'error': 'Document generation failed - output file not created'}), 500
+        try:
+            data = generate_hra_bytes(selected_fields, candidate_name)
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 500
 
-            final_path = f"data/{candidate_name}_juvenile_hra.docx"
-            shutil.copy(output_path, final_path)
-
-            return send_file(
-                final_path,
-                as_attachment=True,
-                download_name=f"{candidate_name}_juvenile_hra.docx",
-                mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            )
-        else:
-            return jsonify({'error': f'Failed to generate HRA: {result}'}), 500
+        return docx_response(io.BytesIO(data), f"{candidate_name}_juvenile_hra.docx", 'juvenile_hra')
 
     except Exception as e:
-        print(f"Error in juvenile HRA endpoint: {e}")
+        logger.exception("Error in juvenile HRA endpoint")
         return jsonify({'error': str(e)}), 500
 
+# Asynchronous HRA generation: the OpenAI + MCP round trip can take tens of
+# seconds, so it runs on a small background pool instead of a request worker
+HRA_JOB_KINDS = {'adult': 'hra_adult', 'juvenile': 'hra_juvenile'}
+
+hra_jobs = JobQueue(
+    db_path=os.environ.get('JOBS_DB_PATH', 'data/jobs.sqlite3'),
+    result_dir=os.environ.get('JOBS_RESULT_DIR', 'data/jobs'),
+    # The current HRA model always writes data/output.docx, so run_hra_model
+    # serializes it behind a cross-process lock and extra workers would only
+    # queue on that lock. Raise this once the model accepts output_file or
+    # output_path (see src/hra_output.py), which run concurrently.
+    max_workers=int(os.environ.get('HRA_JOB_WORKERS', '1')),
+    default_timeout=float(os.environ.get('HRA_JOB_TIMEOUT', '600')),
+    # Importing the app must not fail another pool's running jobs; the pool
+    # that runs them recovers at startup (see recover_interrupted_jobs)
+    recover=False,
+)
+
+def make_hra_handler(model=None):
+    """Job handler running the HRA model; `model` defaults to the OpenAI + MCP model."""
+    def handler(params, ctx):
+        ctx.progress(0.1, 'Running HRA model')
+        return generate_hra_bytes(params['selected_fields'], params['candidate_name'], model=model)
+    return handler
+
+for job_kind in HRA_JOB_KINDS.values():
+    hra_jobs.register(job_kind, make_hra_handler())
+
+# Bounded retention for generated files: job results and leftover HRA scratch
+# directories older than OUTPUT_RETENTION_SECONDS (or beyond the newest
+# OUTPUT_RETENTION_MAX_FILES per directory) are deleted in the background
+output_sweeper = OutputSweeper(
+    [hra_jobs.result_dir, HRA_OUTPUT_ROOT],
+    max_age=float(os.environ.get('OUTPUT_RETENTION_SECONDS', '3600')),
+    max_entries=int(os.environ.get('OUTPUT_RETENTION_MAX_FILES', '500')),
+    interval=float(os.environ.get('OUTPUT_SWEEP_INTERVAL', '300')),
+)
+
+def job_status(job):
+    """Public view of a job row"""
+    return {
+        'job_id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'message': job['message'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at'],
+        'status_url': f"/jobs/{job['id']}",
+        'result_url': f"/jobs/{job['id']}/result",
+    }
+
+@app.route('/jobs/hra', methods=['POST'])
+def submit_hra_job():
+    """Queue an Adult or Juvenile HRA and return its job ID right away"""
+    data = request.get_json(silent=True) or {}
+    selected_fields = data.get('selected_fields', [])
+    candidate_name = data.get('candidate_name', '')
+    kind = HRA_JOB_KINDS.get(data.get('kind', ''))
+
+    if kind is None:
+        return jsonify({'error': f"kind must be one of {sorted(HRA_JOB_KINDS)}"}), 400
+    if not candidate_name:
+        return jsonify({'error': 'Candidate name is required'}), 400
+    if not selected_fields:
+        return jsonify({'error': 'At least one field must be selected'}), 400
+
+    timeout = data.get('timeout')
+    try:
+        timeout = float(timeout) if timeout else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'timeout must be a number of seconds'}), 400
+    if timeout is not None and not 0 < timeout <= hra_jobs.max_timeout:
+        return jsonify({'error': f'timeout must be between 0 and {hra_jobs.max_timeout:.0f} seconds'}), 400
+
+    job_id = hra_jobs.submit(kind, {'selected_fields': selected_fields, 'candidate_name': candidate_name}, timeout=timeout)
+    logger.info("Queued HRA job", extra={'kind': kind, 'job_id': job_id})
+    return jsonify(job_status(hra_jobs.get(job_id))), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status and progress of a job"""
+    job = hra_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job_status(job))
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """Download the document produced by a finished job"""
+    job = hra_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    if job['status'] not in FINISHED_STATES:
+        return jsonify({'error': 'Job has not finished yet', **job_status(job)}), 409
+    if job['status'] != SUCCEEDED or not job['result_path'] or not os.path.exists(job['result_path']):
+        return jsonify({'error': job['error'] or f"Job {job['status']}", **job_status(job)}), 410
+
+    suffix = 'adult' if job['kind'] == HRA_JOB_KINDS['adult'] else 'juvenile'
+    return send_file(
+        os.path.abspath(job['result_path']),
+        as_attachment=True,
+        download_name=f"{job['params']['candidate_name']}_{suffix}_hra.docx",
+        mimetype=DOCX_MIMETYPE
+    )
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running job"""
+    if hra_jobs.get(job_id) is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    cancelled = hra_jobs.cancel(job_id)
+    return jsonify({'cancelled': cancelled, **job_status(hra_jobs.get(job_id))})
+
+@app.route('/jobs/stats', methods=['GET'])
+def job_stats():
+    """Job counts by status and files removed by the retention sweeper"""
+    return jsonify({'jobs': hra_jobs.counts(), 'swept_outputs': output_sweeper.removed})
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors by serving the frontend"""
-    return send_from_directory(app.static_folder, 'index.html')
+    return serve_frontend()
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
     return jsonify({'error': 'Internal server error'}), 500
 
-if __name__ == '__main__':
+# Per-process startup and shutdown, shared by the development server below
+# and the production entry point (gunicorn.conf.py)
+def start_background_work():
+    """Warm up this serving process and start its background threads"""
     os.makedirs('data', exist_ok=True)
     os.makedirs('image', exist_ok=True)
+    asset_pipeline.manifest()
+    warm_up()
+    output_sweeper.start()
+
+def recover_interrupted_jobs():
+    """Fail the HRA jobs a previous server left queued or running; run once per HRA pool start"""
+    recovered = hra_jobs.recover_interrupted()
+    if recovered:
+        logger.warning(f"⚠️ {recovered} HRA job(s) interrupted by a server restart marked failed")
+    return recovered
+
+def stop_background_work(timeout=None):
+    """Stop background threads and give running HRA jobs up to `timeout` seconds to finish"""
+    output_sweeper.stop()
+    search_index.stop()
+    interrupted = hra_jobs.shutdown(timeout)
+    if interrupted:
+        logger.warning(f"⚠️ {interrupted} HRA job(s) interrupted by shutdown")
+    return interrupted
+
+# Development server only; in production run `gunicorn -c gunicorn.conf.py app:app`
+if __name__ == '__main__':
+    recover_interrupted_jobs()
+    start_background_work()
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=True, host='0.0.0.0', port=port)
\ No newline at end of file
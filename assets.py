@@ -0,0 +1,194 @@
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+
+logger = logging.getLogger(__name__)
+
+ASSET_BUILD_DIR = os.environ.get("ASSET_BUILD_DIR", "build/assets")
+# "auto": serve the built bundle, building it when the sources changed and
+# esbuild is available; "off": serve the sources with in-browser Babel
+ASSET_BUNDLE = os.environ.get("ASSET_BUNDLE", "auto").lower()
+ESBUILD = os.environ.get("ESBUILD", "esbuild")
+
+# Source file -> esbuild loader. Each is transpiled/minified into a
+# content-hashed file, so it can be cached forever under its name.
+BUNDLED = {"app.js": "jsx", "styles.css": "css"}
+INDEX = "index.html"
+MANIFEST = "manifest.json"
+# Precompressed variants in order of preference: (Content-Encoding, suffix)
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_BABEL_SCRIPT = re.compile(r'[ \t]*<script src="[^"]*@babel/standalone[^"]*"></script>\r?\n?')
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _compressed_variants(data):
+    """(suffix, bytes) for each precompressed variant; brotli only if installed."""
+    variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        variants.append((".br", brotli.compress(data, quality=11)))
+    return variants
+
+
+class AssetPipeline:
+    """
+    Builds the frontend for production: app.js is transpiled from JSX and
+    minified with esbuild, styles.css is minified, and each is written under
+    a content-hashed name with gzip/brotli variants. index.html is rewritten
+    to load them instead of transpiling app.js in the browser.
+
+    manifest.json records the source hashes the build was made from; the
+    build is reused while they match and redone otherwise. Without esbuild
+    (or with ASSET_BUNDLE=off) manifest() returns None and the sources are
+    served as they are.
+    """
+
+    def __init__(self, source_dir, build_dir=ASSET_BUILD_DIR, esbuild=ESBUILD, mode=ASSET_BUNDLE):
+        self.source_dir = source_dir
+        self.build_dir = build_dir
+        self.esbuild = esbuild
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._manifest = None
+
+    def _source_hashes(self):
+        hashes = {}
+        for name in (*BUNDLED, INDEX):
+            with open(os.path.join(self.source_dir, name), "rb") as f:
+                hashes[name] = _digest(f.read())
+        return hashes
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.build_dir, MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _transform(self, name, loader):
+        esbuild = shutil.which(self.esbuild)
+        if esbuild is None:
+            raise RuntimeError(f"esbuild not found (ESBUILD={self.esbuild!r})")
+        command = [esbuild, os.path.join(self.source_dir, name), "--minify", "--legal-comments=none"]
+        if loader == "jsx":
+            command += ["--loader:.js=jsx", "--target=es2018"]
+        result = subprocess.run(command, capture_output=True, timeout=120)
+        if result.returncode != 0:
+            raise RuntimeError(f"esbuild failed on {name}: {result.stderr.decode(errors='replace').strip()}")
+        return result.stdout
+
+    def _emit(self, name, data):
+        path = os.path.join(self.build_dir, name)
+        _write(path, data)
+        for suffix, compressed in _compressed_variants(data):
+            if len(compressed) < len(data):
+                _write(path + suffix, compressed)
+
+    def _rewrite_index(self, html, files):
+        html = _BABEL_SCRIPT.sub("", html)
+        replacements = {
+            '<script type="text/babel" src="app.js"></script>': f'<script src="/assets/{files["app.js"]}"></script>',
+            'href="styles.css"': f'href="/assets/{files["styles.css"]}"',
+        }
+        for old, new in replacements.items():
+            if old not in html:
+                raise RuntimeError(f"{INDEX} no longer contains {old!r}; update AssetPipeline._rewrite_index")
+            html = html.replace(old, new)
+        return html
+
+    def build(self):
+        """Build every asset and the rewritten index.html; returns the manifest."""
+        hashes = self._source_hashes()
+        os.makedirs(self.build_dir, exist_ok=True)
+        files = {}
+        for name, loader in BUNDLED.items():
+            data = self._transform(name, loader)
+            stem, ext = os.path.splitext(name)
+            files[name] = f"{stem}.{_digest(data)[:12]}{ext}"
+            self._emit(files[name], data)
+
+        with open(os.path.join(self.source_dir, INDEX), encoding="utf-8", newline="") as f:
+            html = f.read()
+        self._emit(INDEX, self._rewrite_index(html, files).encode("utf-8"))
+
+        manifest = {"sources": hashes, "files": files}
+        _write(os.path.join(self.build_dir, MANIFEST), json.dumps(manifest, indent=2).encode("utf-8"))
+        logger.info(f"✅ Built frontend assets: {', '.join(files.values())}")
+        return manifest
+
+    def _load_or_build(self):
+        if self.mode == "off":
+            return None
+        hashes = self._source_hashes()
+        manifest = self._read_manifest()
+        if manifest and manifest.get("sources") == hashes:
+            return manifest
+        try:
+            return self.build()
+        except Exception as e:
+            logger.warning(f"⚠️ Frontend build unavailable, serving untranspiled sources: {e}")
+            return None
+
+    def manifest(self):
+        """The current build's manifest (building it on first use), or None to serve sources."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._manifest = self._load_or_build()
+                    self._loaded = True
+        return self._manifest
+
+    def is_bundle_file(self, name):
+        manifest = self.manifest()
+        return bool(manifest) and name in manifest["files"].values()
+
+
+def choose_variant(directory, filename, accepts):
+    """
+    (file name, Content-Encoding or None) to send for `filename`: the first
+    precompressed variant on disk whose encoding `accepts(encoding)` allows.
+    """
+    for encoding, suffix in ENCODINGS:
+        if accepts(encoding) and os.path.isfile(os.path.join(directory, filename + suffix)):
+            return filename + suffix, encoding
+    return filename, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.assets",
+        description="Build the production frontend bundle (requires esbuild).",
+    )
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--source", default="frontend", help="directory with index.html, app.js and styles.css")
+    parser.add_argument("--out", default=ASSET_BUILD_DIR)
+    args = parser.parse_args(argv)
+
+    manifest = AssetPipeline(args.source, args.out, mode="auto").build()
+    print(json.dumps(manifest["files"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
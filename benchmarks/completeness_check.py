@@ -0,0 +1,122 @@
+"""
+Parity and timing check for the roster-wide completeness report.
+
+Computes availability for a synthetic roster with src.completeness and
+checks every youth x field against the per-youth path the validation report
+takes (merge_source_records, get_case_notes, is_field_missing). Source
+frames are seeded with blank, whitespace-only, "nan" and case-note
+placeholder values so the edge cases are covered. It then times the
+vectorized computation on a large roster, next to the per-youth path on the
+sample scaled up to the same size. Exits non-zero on any mismatch.
+
+    python -m benchmarks.completeness_check
+    python -m benchmarks.completeness_check --rows 5000 --timing-rows 100000
+"""
+import argparse
+import random
+import sys
+import time
+
+import src.reentry_care_plan as rcp
+from src.completeness import availability, summarize, missing_fields
+
+from benchmarks import fixtures
+
+# Values written over random cells, on top of the fixtures' own None values
+EDGE_VALUES = ["", "   ", "nan", "None", " none ", "No case notes available.", float("nan")]
+EDGE_RATE = 0.05
+
+
+def source_frames(records, seed=0, edge_rate=EDGE_RATE):
+    """Normalized per-source frames, in merge precedence order, with edge values sprinkled in."""
+    frames = {}
+    for name, _ in rcp.SOURCE_FETCHERS:
+        frame = rcp.normalize_columns(fixtures.source_frame(records, name, seed))
+        rng = random.Random(f"edges-{name}-{seed}")
+        for column in frame.columns:
+            if column in ("Medical ID Number", "Name of the youth"):
+                continue
+            values = frame[column].astype(object).tolist()
+            for i in range(len(values)):
+                if rng.random() < edge_rate:
+                    values[i] = rng.choice(EDGE_VALUES)
+            frame[column] = values
+        frames[name] = frame
+    return frames
+
+
+def per_youth_availability(frames, fields):
+    """Medical ID -> {field: available}, the way the validation report decides it."""
+    rows = {name: rcp._records_by_medical_id(frame) for name, frame in frames.items()}
+    medical_ids = list(dict.fromkeys(mid for by_id in rows.values() for mid in by_id))
+    result = {}
+    for mid in medical_ids:
+        records = {name: by_id.get(mid, {}) for name, by_id in rows.items()}
+        merged = rcp.merge_source_records(records, mid)
+        notes = rcp.get_case_notes(records["sql"], records["bigquery"], records["excel"])
+        result[mid] = {field: not rcp.is_field_missing(merged, field, notes) for field in fields}
+    return result
+
+
+def check_parity(rows, seed):
+    fields = rcp.DISPLAY_ORDER_REENTRY
+    frames = source_frames(fixtures.synthetic_records(rows, seed), seed)
+    available, _, _, _ = availability(frames, fields, rcp.CASE_NOTE_KEYS)
+    expected = per_youth_availability(frames, fields)
+
+    problems = []
+    if set(available.index) != set(expected):
+        problems.append(f"youths differ: {len(available)} vectorized vs {len(expected)} per-youth")
+    for mid, by_field in expected.items():
+        if mid not in available.index:
+            continue
+        row = available.loc[mid]
+        for field, value in by_field.items():
+            if bool(row[field]) != value:
+                problems.append(f"{mid} {field!r}: per-youth {value}, vectorized {bool(row[field])}")
+
+    if problems:
+        print(f"❌ completeness parity on {rows} youths: {len(problems)} mismatches")
+        for problem in problems[:20]:
+            print(f"   {problem}")
+        return False
+    print(f"✅ completeness parity on {rows} youths x {len(fields)} fields")
+    return True
+
+
+def time_computation(rows, sample_rows, seed):
+    fields = rcp.DISPLAY_ORDER_REENTRY
+
+    started = time.perf_counter()
+    frames = source_frames(fixtures.synthetic_records(rows, seed), seed)
+    generated = time.perf_counter()
+    available, present, by_source, names = availability(frames, fields, rcp.CASE_NOTE_KEYS)
+    summarize(available, present, by_source)
+    missing = missing_fields(available, present, names)
+    computed = time.perf_counter()
+
+    sample = source_frames(fixtures.synthetic_records(sample_rows, seed), seed)
+    sample_started = time.perf_counter()
+    per_youth_availability(sample, fields)
+    per_youth_seconds = (time.perf_counter() - sample_started) * rows / sample_rows
+
+    print(f"⏱️ {rows} youths: fixtures {generated - started:.2f}s, "
+          f"vectorized completeness {computed - generated:.2f}s ({len(missing)} missing cells), "
+          f"per-youth path ~{per_youth_seconds:.1f}s (scaled from {sample_rows})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000, help="youths in the parity sample")
+    parser.add_argument("--timing-rows", type=int, default=100000, help="youths in the timed roster (0 to skip)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    ok = check_parity(args.rows, args.seed)
+    if args.timing_rows:
+        time_computation(args.timing_rows, args.rows, args.seed)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Parity check between the python-docx and OOXML report backends.
+
+Renders the same records with both backends and compares the extracted
+paragraph text, table cell text, cell border colors and the raw
+word/document.xml. Both outputs are also read back and checked against the
+title, value text and border colors expected from the input record, so the
+check fails when both backends break the same way. Exits non-zero on any
+difference.
+
+    python -m benchmarks.docx_parity
+    python -m benchmarks.docx_parity --template data/Template.docx
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import zipfile
+
+import src.reentry_care_plan as rcp
+
+SAMPLE_RECORD = {
+    "Name of the youth": "Jane Q. Doe",
+    "Medical ID Number": "90000001",
+    "Race/Ethnicity": "Hispanic/Latino",
+    "Telephone": " (555) 010-0000 ",
+    "Residential Address": "12 Elm St & Apt <4>\nSpringfield",
+    "Case Notes": "Line one\tindented\r\nLine two",
+    "Housing": float("nan"),
+    "Employment": "",
+    "Court dates": "nan",
+    "Prescribed Medications": 'Med "A" 10mg',
+}
+
+ALL_FIELDS = [f"{key} (CM)" for key in rcp.DISPLAY_ORDER_REENTRY]
+SOME_FIELDS = ["Name of the youth (CM)", "Residential Address (Excel)", "Case Notes (SQL)", "Housing (SQL)"]
+
+
+def extract(doc_io):
+    from docx import Document
+    from docx.oxml.ns import qn
+
+    doc_io.seek(0)
+    doc = Document(doc_io)
+    tables = []
+    for table in doc.tables:
+        rows = []
+        for row in table.rows:
+            cells = []
+            for cell in row.cells:
+                colors = []
+                tcPr = cell._tc.tcPr
+                if tcPr is not None:
+                    for borders in tcPr.findall(qn("w:tcBorders")):
+                        colors.extend(border.get(qn("w:color")) for border in borders)
+                cells.append((cell.text, tuple(colors)))
+            rows.append(cells)
+        tables.append(rows)
+    return {"paragraphs": [p.text for p in doc.paragraphs], "tables": tables}
+
+
+def document_xml(doc_io):
+    doc_io.seek(0)
+    with zipfile.ZipFile(doc_io) as zf:
+        return zf.read("word/document.xml")
+
+
+# Cell borders the validation report draws: red when missing, green otherwise
+MISSING_BORDERS = ("FF0000",) * 6
+AVAILABLE_BORDERS = ("008000",) * 6
+
+
+def _squash(text):
+    """Collapse whitespace; line breaks and tabs read back differently across python-docx versions."""
+    return " ".join(str(text).split())
+
+
+def _blank(value):
+    return value is None or (isinstance(value, float) and math.isnan(value)) or str(value).strip() == ""
+
+
+def expected_care_plan(record, fields):
+    """(value text, border colors) per row, worked out from the record itself."""
+    selected = set(rcp.normalize_selected_fields(fields))
+    rows = []
+    for key in rcp.DISPLAY_ORDER_REENTRY:
+        value = record.get(key)
+        if key not in selected:
+            text = "Not Selected"
+        elif _blank(value) or str(value).lower() == "nan":
+            text = "Data Not Available"
+        else:
+            text = str(value)
+        rows.append((text, ()))
+    return rows
+
+
+def expected_validation_report(record, notes):
+    rows = []
+    for key in rcp.DISPLAY_ORDER_REENTRY:
+        if key == "Case Notes":
+            missing = _blank(notes) or str(notes).lower() in ("nan", "none", "no case notes available.")
+        else:
+            missing = _blank(record.get(key))
+        rows.append(("Data Not Available", MISSING_BORDERS) if missing else ("Data Available", AVAILABLE_BORDERS))
+    return rows
+
+
+def expectation_problems(doc_io, kind, title, rows):
+    """Differences between a saved report and the title and rows it should hold."""
+    _, layout = rcp.report_template.clone(kind, rcp.REPORT_SKELETONS[kind])
+    saved = extract(doc_io)
+    problems = []
+    saved_title = saved["paragraphs"][layout["title"]]
+    if saved_title != title:
+        problems.append(f"title is {saved_title!r}, expected {title!r}")
+    saved_rows = saved["tables"][layout["table"]][1:]
+    if len(saved_rows) != len(rows):
+        problems.append(f"{len(saved_rows)} rows, expected {len(rows)}")
+    for key, row, (text, borders) in zip(rcp.DISPLAY_ORDER_REENTRY, saved_rows, rows):
+        got_text, got_borders = row[1]
+        if _squash(got_text) != _squash(text):
+            problems.append(f"{key}: value {got_text!r}, expected {text!r}")
+        if got_borders != borders:
+            problems.append(f"{key}: borders {got_borders}, expected {borders}")
+    return problems
+
+
+def compare(label, render, kind, title, rows):
+    reference = render("python-docx")
+    fast = render("ooxml")
+    problems = []
+    for backend, doc_io in (("python-docx", reference), ("ooxml", fast)):
+        problems.extend(f"{backend}: {p}" for p in expectation_problems(doc_io, kind, title, rows))
+    if extract(reference) != extract(fast):
+        problems.append("extracted text/borders differ")
+    if document_xml(reference) != document_xml(fast):
+        problems.append("word/document.xml differs")
+    print(f"{'FAIL' if problems else 'ok  '} {label}" + (f": {'; '.join(problems)}" if problems else ""))
+    return not problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--template", help="template .docx (default: a blank python-docx document)")
+    args = parser.parse_args(argv)
+
+    template = args.template
+    if not template:
+        from docx import Document
+        handle, template = tempfile.mkstemp(suffix=".docx")
+        os.close(handle)
+        Document().save(template)
+    rcp.report_template.path = template
+
+    def care_plan(label, name, record, fields):
+        return compare(label, lambda backend: rcp.render_reentry_care_plan(name, record, fields, backend=backend),
+                       "reentry_care_plan", f"{name}'s Reentry Care Plan", expected_care_plan(record, fields))
+
+    def validation_report(label, name, record, notes):
+        return compare(label, lambda backend: rcp.render_data_validation_report(name, record, notes, backend=backend),
+                       "data_validation_report", f"Data Validation Report for {name}",
+                       expected_validation_report(record, notes))
+
+    # Render every case for real rather than from the rendered document cache
+    rcp.RENDER_CACHE_MAX_BYTES = 0
+    results = [
+        care_plan("care plan, all fields", "Jane Q. Doe", SAMPLE_RECORD, ALL_FIELDS),
+        care_plan("care plan, some fields", "Jane Q. Doe", SAMPLE_RECORD, SOME_FIELDS),
+        care_plan("care plan, empty record", "Nobody", {}, ALL_FIELDS),
+        validation_report("validation report", "Jane Q. Doe", SAMPLE_RECORD, SAMPLE_RECORD["Case Notes"]),
+        validation_report("validation report, no notes", "Jane Q. Doe", SAMPLE_RECORD, "No case notes available."),
+    ]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
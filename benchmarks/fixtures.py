@@ -0,0 +1,122 @@
+"""
+Synthetic stand-ins for the three data sources.
+
+Rows are generated deterministically from a seed. Each source uses its own
+real CANON_MAP column variants, so the normalization path is exercised the
+same way as in production:
+- The Excel roster uses display-style headers such as "Name" or "Release Date".
+- The Cloud SQL and BigQuery tables use snake_case columns.
+
+Generated files are cached under the work directory by row count and seed.
+"""
+import os
+import random
+
+import pandas as pd
+
+import src.reentry_care_plan as rcp
+
+FIRST_NAMES = [
+    "Aaliyah", "Andre", "Bianca", "Carlos", "Dante", "Elena", "Fatima", "Gabriel", "Hana", "Isaiah",
+    "Jasmine", "Jordan", "Kiara", "Luis", "Maya", "Nadia", "Omar", "Priya", "Quinn", "Rosa",
+    "Samuel", "Tamika", "Uriel", "Valeria", "Wesley", "Ximena", "Yusuf", "Zoe", "Marcus", "Lena",
+]
+LAST_NAMES = [
+    "Alvarez", "Brooks", "Chen", "Diaz", "Edwards", "Flores", "Garcia", "Hernandez", "Ibrahim", "Johnson",
+    "Kim", "Lopez", "Martinez", "Nguyen", "Ortiz", "Patel", "Ramirez", "Smith", "Torres", "Washington",
+]
+
+# Share of youths present in each source (the roster lists everyone)
+SOURCE_COVERAGE = {"excel": 1.0, "sql": 0.7, "bigquery": 0.5}
+# Share of field values left empty
+MISSING_RATE = 0.15
+
+# Columns the SQL and BigQuery lookups filter on
+_KEY_COLUMNS = {"Medical ID Number": "medical_id_number", "Name of the youth": "youth_name"}
+
+
+def column_variants():
+    """Canonical field -> all CANON_MAP column names that normalize to it."""
+    variants = {}
+    for column, canonical in rcp.CANON_MAP.items():
+        variants.setdefault(canonical, []).append(column)
+    return variants
+
+
+def source_columns(source, seed=0):
+    """Canonical field -> column name used by `source` ("excel", "sql" or "bigquery")."""
+    rng = random.Random(f"{source}-{seed}")
+    columns = {}
+    for canonical, names in column_variants().items():
+        if source == "excel":
+            choices = [n for n in names if n != n.lower() or " " in n] or names
+        else:
+            if canonical in _KEY_COLUMNS:
+                columns[canonical] = _KEY_COLUMNS[canonical]
+                continue
+            choices = [n for n in names if n == n.lower() and " " not in n] or names
+        columns[canonical] = rng.choice(sorted(choices))
+    return columns
+
+
+def _value_pool(canonical, rng):
+    if canonical == "Case Notes":
+        words = "met youth discussed housing plan follow up court date medication referral employment".split()
+        return [" ".join(rng.choices(words, k=40)) for _ in range(64)]
+    return [f"{canonical} value {i}" for i in range(32)]
+
+
+def synthetic_records(rows, seed=0):
+    """
+    `rows` canonical records. Names repeat across youths (30 x 20 name
+    combinations), so a name search returns several candidates, as it does
+    for common names in production.
+    """
+    rng = random.Random(seed)
+    fields = [c for c in column_variants() if c not in _KEY_COLUMNS]
+    pools = {field: _value_pool(field, rng) for field in fields}
+    records = []
+    for i in range(rows):
+        record = {
+            "Medical ID Number": str(900000000 + i),
+            "Name of the youth": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        }
+        for field in fields:
+            record[field] = None if rng.random() < MISSING_RATE else rng.choice(pools[field])
+        records.append(record)
+    return records
+
+
+def source_frame(records, source, seed=0):
+    """The slice of `records` held by `source`, with that source's column names."""
+    rng = random.Random(f"coverage-{source}-{seed}")
+    coverage = SOURCE_COVERAGE[source]
+    kept = [r for r in records if coverage >= 1.0 or rng.random() < coverage]
+    columns = source_columns(source, seed)
+    return pd.DataFrame(kept).rename(columns=columns)
+
+
+def write_roster(records, path, seed=0):
+    """Write the Excel roster (reentry5.xlsx layout) unless it already exists."""
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp.xlsx"
+        source_frame(records, "excel", seed).to_excel(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    return path
+
+
+def write_sqlite(records, path, seed=0):
+    """Write the SocialEconomicLogistics_backup stand-in table unless the database exists."""
+    import sqlite3
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with sqlite3.connect(tmp_path) as conn:
+            frame = source_frame(records, "sql", seed)
+            frame.to_sql(rcp.SQL_TABLE, conn, index=False, if_exists="replace")
+            conn.execute(f"CREATE INDEX ix_mid ON {rcp.SQL_TABLE} (medical_id_number)")
+            conn.execute(f"CREATE INDEX ix_name ON {rcp.SQL_TABLE} (youth_name)")
+        os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,75 @@
+"""
+Cold-import benchmark for the backend modules.
+
+Each sample imports the module in a fresh interpreter, so nothing is shared
+between runs. Compare against a baseline commit to measure startup changes:
+
+    python -m benchmarks.import_time --module src.reentry_care_plan --runs 10
+    python -m benchmarks.import_time --module app --importtime
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+_PROBE = (
+    "import time; started = time.perf_counter(); "
+    "import {module}; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def measure(module, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            capture_output=True, text=True, check=True,
+        )
+        # The module may print during import; the timing is the last line
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def slowest_imports(module, top):
+    """Top modules by cumulative import time, from `python -X importtime`."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:  self [us] | cumulative | imported package"
+        _, cumulative_us, name = line.split(":", 1)[1].split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    rows.sort(reverse=True)
+    return [{"module": name, "cumulative_ms": round(us / 1000, 1)} for us, name in rows[:top]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="src.reentry_care_plan")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true",
+                        help="also list the slowest imports via -X importtime")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    samples = measure(args.module, args.runs)
+    result = {
+        "module": args.module,
+        "runs": args.runs,
+        "min_s": round(min(samples), 4),
+        "median_s": round(statistics.median(samples), 4),
+        "max_s": round(max(samples), 4),
+    }
+    if args.importtime:
+        result["slowest_imports"] = slowest_imports(args.module, args.top)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
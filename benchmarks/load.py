@@ -0,0 +1,169 @@
+"""
+Latency benchmark for the candidate search, both report generators and the
+Flask endpoints, run against offline stand-ins (see benchmarks/offline.py).
+
+Each scenario issues `--requests` calls from `--concurrency` threads and
+reports p50/p95/p99 latency, throughput, errors and the process's peak RSS
+as JSON, one result per roster size:
+
+    python -m benchmarks.load --rows 1000
+    python -m benchmarks.load --rows 1000,100000 --concurrency 16 --bq-latency 0.2 --sql-latency 0.02
+    python -m benchmarks.load --rows 1000000 --scenarios candidates --output bench_1m.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Keep request logging out of the measurements
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import src.reentry_care_plan as rcp
+
+from benchmarks import offline
+
+SCENARIOS = (
+    "candidates", "care_plan", "validation_report",
+    "endpoint_candidates", "endpoint_care_plan", "endpoint_validation_report",
+)
+SELECTED_FIELDS = [f"{field} (CM)" for field in rcp.DISPLAY_ORDER_REENTRY]
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where it cannot be read."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(sorted_samples, fraction):
+    if not sorted_samples:
+        return None
+    index = min(len(sorted_samples) - 1, max(0, round(fraction * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def run_scenario(call, inputs, concurrency):
+    """Run `call(input)` for every input on `concurrency` threads; return latency stats."""
+    def timed(item):
+        started = time.perf_counter()
+        try:
+            ok = call(item) is not False
+        except Exception:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, inputs))
+    wall = time.perf_counter() - started
+
+    samples = sorted(seconds for seconds, _ in results)
+    return {
+        "requests": len(results),
+        "errors": sum(1 for _, ok in results if not ok),
+        "throughput_rps": round(len(results) / wall, 2) if wall else None,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+        "max_ms": round(samples[-1] * 1000, 2),
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def scenario_calls():
+    """Scenario name -> (callable, builds one input from a record)."""
+    def display(record):
+        return f"{record['Name of the youth']} (Medical ID: {record['Medical ID Number']})"
+
+    calls = {
+        "candidates": (rcp.get_candidates_by_name, lambda r: r["Name of the youth"]),
+        "care_plan": (
+            lambda name: rcp.generate_reentry_care_plan(SELECTED_FIELDS, name, "reentry_care_plan") is not None,
+            display,
+        ),
+        "validation_report": (
+            lambda name: rcp.generate_data_validation_report(SELECTED_FIELDS, name, "data_validation_report") is not None,
+            display,
+        ),
+    }
+
+    def endpoint(path, body):
+        def call(value):
+            import app as flask_app  # imported on first use: pulls in Flask and the job queue
+            response = flask_app.app.test_client().post(path, json=body(value))
+            response.get_data()
+            return response.status_code == 200
+        return call
+
+    calls["endpoint_candidates"] = (
+        endpoint("/get_candidates_by_name", lambda name: {"candidate_name": name}),
+        lambda r: r["Name of the youth"],
+    )
+    for scenario, path in (("endpoint_care_plan", "/generate_reentry_care_plan"),
+                           ("endpoint_validation_report", "/generate_data_validation_report")):
+        calls[scenario] = (
+            endpoint(path, lambda name: {"candidate_name": name, "selected_fields": SELECTED_FIELDS}),
+            display,
+        )
+    return calls
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", default="1000",
+                        help="comma-separated roster sizes, e.g. 1000,100000,1000000")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sql-latency", type=float, default=0.0, help="seconds added to every SQL statement")
+    parser.add_argument("--bq-latency", type=float, default=0.0, help="seconds added to every BigQuery job")
+    parser.add_argument("--cold", action="store_true", help="disable record, render and BigQuery caches")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default="data/bench", help="where generated fixtures are kept")
+    parser.add_argument("--template", help="report template (default: a blank document)")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = sorted(set(scenarios) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    results = {
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "workdir")},
+        "runs": [],
+    }
+    for rows in (int(r) for r in args.rows.split(",")):
+        started = time.perf_counter()
+        records = offline.install(args.workdir, rows, seed=args.seed, sql_latency=args.sql_latency,
+                                  bq_latency=args.bq_latency, template=args.template, cold=args.cold)
+        rcp.warm_up()
+        run = {"rows": rows, "setup_s": round(time.perf_counter() - started, 2), "scenarios": {}}
+
+        rng = random.Random(args.seed)
+        sample = [rng.choice(records) for _ in range(args.requests)]
+        calls = scenario_calls()
+        for scenario in scenarios:
+            call, make_input = calls[scenario]
+            run["scenarios"][scenario] = run_scenario(call, [make_input(r) for r in sample], args.concurrency)
+            print(f"{rows:>8} rows  {scenario:<28} p50 {run['scenarios'][scenario]['p50_ms']:>9} ms"
+                  f"  p99 {run['scenarios'][scenario]['p99_ms']:>9} ms", file=sys.stderr)
+        results["runs"].append(run)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
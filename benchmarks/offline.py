@@ -0,0 +1,63 @@
+"""
+Point the backend at local stand-ins instead of GCP and MySQL.
+
+- The Excel roster is a generated workbook.
+- Cloud SQL is a SQLite database injected with set_sql_engine(). Optional
+  per-statement latency mimics the network round trip.
+- BigQuery is a CannedBigQueryClient with injectable latency.
+- The report template is a blank document unless one is given.
+"""
+import os
+import time
+
+import src.reentry_care_plan as rcp
+from src.bigquery_access import BigQueryAccess, CannedBigQueryClient
+
+from benchmarks import fixtures
+
+
+def install(workdir, rows, seed=0, sql_latency=0.0, bq_latency=0.0, template=None, cold=False):
+    """
+    Generate (or reuse) the fixtures for `rows` youths and wire them into
+    src.reentry_care_plan. With `cold`, the record, render and BigQuery
+    result caches are disabled so every call does the full work.
+    Returns the synthetic records.
+    """
+    from sqlalchemy import create_engine, event
+
+    os.makedirs(workdir, exist_ok=True)
+    records = fixtures.synthetic_records(rows, seed)
+
+    roster_path = fixtures.write_roster(records, os.path.join(workdir, f"reentry5_{rows}_{seed}.xlsx"), seed)
+    rcp.roster_store.path = roster_path
+    rcp.roster_store.invalidate()
+
+    db_path = fixtures.write_sqlite(records, os.path.join(workdir, f"serrano_{rows}_{seed}.sqlite3"), seed)
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={"check_same_thread": False},
+        pool_size=rcp.SQL_POOL_SIZE,
+        max_overflow=rcp.SQL_MAX_OVERFLOW,
+    )
+    if sql_latency:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _delay(*args):
+            time.sleep(sql_latency)
+    rcp.set_sql_engine(engine)
+
+    client = CannedBigQueryClient(fixtures.source_frame(records, "bigquery", seed), latency=bq_latency)
+    rcp.bigquery_access = BigQueryAccess(lambda: client, cache_ttl=0.0 if cold else 300.0)
+
+    if template is None:
+        from docx import Document
+        template = os.path.join(workdir, "Template.docx")
+        if not os.path.exists(template):
+            Document().save(template)
+    rcp.report_template.path = template
+
+    if cold:
+        rcp.RENDER_CACHE_MAX_BYTES = 0
+        rcp.record_cache.ttls = {}
+        rcp.record_cache.default_ttl = 0.0
+    rcp.record_cache.invalidate()
+    return records
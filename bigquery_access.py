@@ -0,0 +1,360 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BQ_TABLE = "genai-poc-424806.SerranoAdvisorsBQ.scalablefeaturesforBQ"
+
+
+class BigQueryAccess:
+    """
+    Read path for the scalablefeaturesforBQ table.
+
+    - Query results are cached in-process, keyed on SQL text plus parameters.
+    - In snapshot mode the whole table is pulled once through the Storage Read
+      API into a local Parquet file and lookups are answered from memory;
+      the file is re-read when it is replaced on disk.
+    - Every query job records latency and bytes processed.
+
+    The client comes from `client_factory`, so tests and benchmarks can pass a
+    CannedBigQueryClient and run without network access.
+    """
+
+    def __init__(self, client_factory, table=BQ_TABLE, cache_ttl=300.0,
+                 cache_max_size=1024, snapshot_path=None):
+        self._client_factory = client_factory
+        self.table = table
+        self.cache_ttl = cache_ttl
+        self.cache_max_size = cache_max_size
+        self.snapshot_path = snapshot_path
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._snapshot_load_lock = threading.Lock()
+        self._snapshot = None
+        self._snapshot_signature = None  # (mtime_ns, size) of the file last loaded or tried
+        self._metrics = {}
+
+    # ---- client / job plumbing ----
+
+    def client(self):
+        return self._client_factory()
+
+    @staticmethod
+    def _job_config(params):
+        from google.cloud import bigquery
+        query_parameters = []
+        for name, type_, value in params:
+            if isinstance(value, (list, tuple)):
+                query_parameters.append(bigquery.ArrayQueryParameter(name, type_, list(value)))
+            else:
+                query_parameters.append(bigquery.ScalarQueryParameter(name, type_, value))
+        return bigquery.QueryJobConfig(query_parameters=query_parameters)
+
+    def _record(self, kind, seconds, bytes_processed=0, cache_hit=False):
+        with self._lock:
+            m = self._metrics.setdefault(kind, {
+                "queries": 0, "cache_hits": 0, "latency_seconds_total": 0.0,
+                "latency_seconds_max": 0.0, "bytes_processed_total": 0,
+            })
+            if cache_hit:
+                m["cache_hits"] += 1
+                return
+            m["queries"] += 1
+            m["latency_seconds_total"] += seconds
+            m["latency_seconds_max"] = max(m["latency_seconds_max"], seconds)
+            m["bytes_processed_total"] += bytes_processed or 0
+
+    def query(self, kind, sql, params, use_cache=True) -> pd.DataFrame:
+        """
+        Run a parameterized query, serving repeats from the result cache.
+        `params` is a sequence of (name, type, value) tuples; list values
+        become array parameters. The returned DataFrame is shared; don't mutate it.
+        With `use_cache=False` the result cache is neither read nor written,
+        for callers that keep their own cache with its own TTL.
+        """
+        client = self.client()
+        if client is None:
+            return pd.DataFrame()
+
+        key = (sql, tuple((n, t, tuple(v) if isinstance(v, (list, tuple)) else v) for n, t, v in params))
+        df = None
+        if use_cache:
+            now = time.monotonic()
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None and now - cached[0] < self.cache_ttl:
+                    self._cache.move_to_end(key)
+                    df = cached[1]
+        if df is not None:
+            self._record(kind, 0.0, cache_hit=True)
+            return df
+
+        started = time.perf_counter()
+        if getattr(client, "accepts_raw_params", False):
+            job = client.query(sql, job_config=params)
+        else:
+            job = client.query(sql, job_config=self._job_config(params))
+        df = job.to_dataframe()
+        self._record(kind, time.perf_counter() - started, getattr(job, "total_bytes_processed", 0))
+        if not use_cache:
+            return df
+
+        with self._lock:
+            self._cache[key] = (time.monotonic(), df)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_size:
+                self._cache.popitem(last=False)
+        return df
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def invalidate(self, medical_id=None):
+        """
+        Drop cached results that involve `medical_id` (all of them when it is
+        None): queries with it as a parameter, and any result containing its
+        rows, such as a lookup by name. Returns the number of entries dropped.
+        """
+        with self._lock:
+            if medical_id is None:
+                removed = len(self._cache)
+                self._cache.clear()
+                return removed
+            mid = str(medical_id).strip()
+            stale = [key for key, (_, df) in self._cache.items() if self._involves(key, df, mid)]
+            for key in stale:
+                del self._cache[key]
+            return len(stale)
+
+    @staticmethod
+    def _involves(key, df, mid):
+        for _, _, value in key[1]:
+            values = value if isinstance(value, tuple) else (value,)
+            if mid in (str(v).strip() for v in values):
+                return True
+        if isinstance(df, pd.DataFrame) and "medical_id_number" in df.columns:
+            return bool(df["medical_id_number"].astype(str).str.strip().eq(mid).any())
+        return False
+
+    # ---- snapshot mode ----
+
+    def refresh_snapshot(self, path=None):
+        """
+        Pull the full table through the Storage Read API into a Parquet file
+        and serve lookups from it. Returns the number of rows written.
+        """
+        import pyarrow.parquet as pq
+
+        path = path or self.snapshot_path
+        if not path:
+            raise ValueError("No snapshot path configured (set BQ_SNAPSHOT_PATH)")
+        client = self.client()
+        if client is None:
+            raise RuntimeError("BigQuery client is not available")
+
+        started = time.perf_counter()
+        arrow_table = client.list_rows(self.table).to_arrow(create_bqstorage_client=True)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        pq.write_table(arrow_table, tmp_path)
+        os.replace(tmp_path, path)
+        self._record("snapshot_pull", time.perf_counter() - started, arrow_table.nbytes)
+
+        self.snapshot_path = path
+        self._load_snapshot(path)
+        return arrow_table.num_rows
+
+    def _load_snapshot(self, path, signature=None):
+        import pyarrow.parquet as pq
+
+        signature = signature or self._file_signature(path)
+        df = pq.read_table(path, memory_map=True).to_pandas()
+        by_id, by_name = {}, {}
+        if "medical_id_number" in df.columns:
+            for pos, mid in enumerate(df["medical_id_number"].astype(str)):
+                by_id.setdefault(mid, []).append(pos)
+        if "youth_name" in df.columns:
+            for pos, name in enumerate(df["youth_name"].astype(str)):
+                by_name.setdefault(name, []).append(pos)
+        with self._lock:
+            self._snapshot = (df, by_id, by_name)
+            self._snapshot_signature = signature
+
+    @staticmethod
+    def _file_signature(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _get_snapshot(self):
+        """The loaded snapshot, (re)loaded first if the file changed since the last look."""
+        if not self.snapshot_path:
+            return self._snapshot
+        signature = self._file_signature(self.snapshot_path)
+        if signature is None or signature == self._snapshot_signature:
+            return self._snapshot
+        with self._snapshot_load_lock:
+            if signature != self._snapshot_signature:
+                try:
+                    self._load_snapshot(self.snapshot_path, signature)
+                except Exception as e:
+                    # Remember the failed file so it is not retried on every lookup
+                    self._snapshot_signature = signature
+                    logger.warning(f"Could not load BigQuery snapshot {self.snapshot_path}: {e}")
+        return self._snapshot
+
+    @staticmethod
+    def _from_snapshot(snapshot, index, keys):
+        """Rows for `keys`; `index` must belong to `snapshot`, which may no longer be the current one."""
+        df = snapshot[0]
+        positions = [pos for key in keys for pos in index.get(str(key), [])]
+        return df.iloc[positions].reset_index(drop=True)
+
+    # ---- lookups ----
+
+    def lookup_by_id(self, medical_id, use_cache=True) -> pd.DataFrame:
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            return self._from_snapshot(snapshot, snapshot[1], [medical_id])
+        return self.query("by_id", f"""
+            SELECT *
+            FROM `{self.table}`
+            WHERE medical_id_number = @mid
+        """, [("mid", "STRING", str(medical_id))], use_cache=use_cache)
+
+    def lookup_by_name(self, name) -> pd.DataFrame:
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            return self._from_snapshot(snapshot, snapshot[2], [name])
+        return self.query("by_name", f"""
+            SELECT *
+            FROM `{self.table}`
+            WHERE youth_name = @name
+        """, [("name", "STRING", name)])
+
+    def lookup_by_ids(self, medical_ids, use_cache=True) -> pd.DataFrame:
+        medical_ids = sorted({str(mid) for mid in medical_ids if mid})
+        if not medical_ids:
+            return pd.DataFrame()
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            return self._from_snapshot(snapshot, snapshot[1], medical_ids)
+        return self.query("by_ids", f"""
+            SELECT *
+            FROM `{self.table}`
+            WHERE medical_id_number IN UNNEST(@ids)
+        """, [("ids", "STRING", medical_ids)], use_cache=use_cache)
+
+    def lookup_names(self) -> pd.DataFrame:
+        """youth_name and medical_id_number for every row, e.g. for the search index."""
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            return snapshot[0]
+        return self.query("names", f"""
+            SELECT youth_name, medical_id_number
+            FROM `{self.table}`
+        """, [])
+
+    def lookup_all(self) -> pd.DataFrame:
+        """The whole table: from the snapshot if loaded, else via the Storage Read API."""
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            return snapshot[0]
+        client = self.client()
+        if client is None:
+            return pd.DataFrame()
+        started = time.perf_counter()
+        df = client.list_rows(self.table).to_dataframe(create_bqstorage_client=True)
+        self._record("full_table", time.perf_counter() - started,
+                     int(df.memory_usage(deep=True).sum()) if not df.empty else 0)
+        return df
+
+    def metrics(self):
+        with self._lock:
+            out = {}
+            for kind, m in self._metrics.items():
+                m = dict(m)
+                m["latency_seconds_avg"] = (
+                    round(m["latency_seconds_total"] / m["queries"], 6) if m["queries"] else 0.0
+                )
+                out[kind] = m
+            return {
+                "cache_entries": len(self._cache),
+                "snapshot_rows": len(self._snapshot[0]) if self._snapshot is not None else None,
+                "queries": out,
+            }
+
+
+class _CannedJob:
+    def __init__(self, df):
+        self._df = df
+        self.total_bytes_processed = int(df.memory_usage(deep=True).sum()) if not df.empty else 0
+
+    def to_dataframe(self):
+        return self._df
+
+
+class _CannedRows:
+    def __init__(self, df):
+        self._df = df
+
+    def to_arrow(self, create_bqstorage_client=False):
+        import pyarrow as pa
+        return pa.Table.from_pandas(self._df, preserve_index=False)
+
+    def to_dataframe(self, create_bqstorage_client=False):
+        return self._df.copy()
+
+
+class CannedBigQueryClient:
+    """
+    Offline stand-in for bigquery.Client that answers the BigQueryAccess
+    lookups from a DataFrame holding the whole table. `latency` (seconds) is
+    slept before every query to mimic job scheduling overhead.
+    """
+
+    accepts_raw_params = True
+
+    def __init__(self, table_df, latency=0.0):
+        self.table_df = table_df
+        self.latency = latency
+        self.queries = 0
+
+    def query(self, sql, job_config=None):
+        self.queries += 1
+        if self.latency:
+            time.sleep(self.latency)
+        df = self.table_df
+        for name, _, value in job_config or []:
+            if name == "mid":
+                df = df[df["medical_id_number"].astype(str) == str(value)]
+            elif name == "name":
+                df = df[df["youth_name"] == value]
+            elif name == "ids":
+                df = df[df["medical_id_number"].astype(str).isin([str(v) for v in value])]
+        return _CannedJob(df.reset_index(drop=True))
+
+    def list_rows(self, table, selected_fields=None):
+        if self.latency:
+            time.sleep(self.latency)
+        return _CannedRows(self.table_df)
+
+
+if __name__ == "__main__":
+    # python -m src.bigquery_access snapshot [path]
+    if len(sys.argv) < 2 or sys.argv[1] != "snapshot":
+        print("usage: python -m src.bigquery_access snapshot [path]")
+        sys.exit(2)
+    from src.reentry_care_plan import bigquery_access
+    target = sys.argv[2] if len(sys.argv) > 2 else (bigquery_access.snapshot_path or "data/bq_snapshot.parquet")
+    rows = bigquery_access.refresh_snapshot(target)
+    print(f"✅ Wrote {rows} BigQuery rows to {target}")
@@ -0,0 +1,283 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+ID_FIELD = "Medical ID Number"
+NAME_FIELD = "Name of the youth"
+# Values the validation report treats as "no case notes"
+NOTE_PLACEHOLDERS = ("nan", "none", "no case notes available.")
+
+
+def _keyed(df):
+    """
+    A normalized source frame indexed by Medical ID, keyed the way the
+    per-youth lookups key it: null IDs dropped, first row per ID kept, and
+    for duplicate column names the last one kept (as `to_dict` does).
+    """
+    if not isinstance(df, pd.DataFrame) or df.empty or ID_FIELD not in df.columns:
+        return pd.DataFrame(index=pd.Index([], name=ID_FIELD))
+    df = df.loc[:, ~df.columns.duplicated(keep="last")]
+    ids = df[ID_FIELD]
+    keys = ids.astype(str).str.strip()
+    keep = ids.notna() & keys.ne("")
+    df = df[keep].set_axis(keys[keep].rename(ID_FIELD), axis=0)
+    return df[~df.index.duplicated(keep="first")]
+
+
+def _blank(values):
+    """
+    Missing the way is_field_missing sees it: null, or a whitespace-only
+    string. Each distinct value is tested once, since most fields repeat a
+    handful of values across the roster.
+    """
+    codes, uniques = pd.factorize(values)  # nulls get code -1
+    blank = np.fromiter((isinstance(u, str) and not u.strip() for u in uniques), dtype=bool, count=len(uniques))
+    return pd.Series(np.append(blank, True)[codes], index=values.index)
+
+
+def _case_notes(frames, present, note_keys):
+    """
+    Case notes per youth, picked as get_case_notes does: for each key in
+    turn, the first of SQL, BigQuery and Excel with a truthy value (a NaN
+    read from a source counts as truthy there, as it does in that loop).
+    """
+    index = present.index
+    notes = pd.Series(None, index=index, dtype=object)
+    resolved = pd.Series(False, index=index)
+    for key in note_keys:
+        for name in ("sql", "bigquery", "excel"):
+            frame = frames.get(name)
+            if frame is None or key not in frame.columns:
+                continue
+            values = frame[key].reindex(index)
+            truthy = present[name] & values.map(bool).astype(bool)
+            take = truthy & ~resolved
+            notes[take] = values[take]
+            resolved |= take
+    return notes
+
+
+def availability(sources, fields, note_keys):
+    """
+    Vectorized youth x field availability for the whole population.
+
+    `sources` maps source name -> normalized DataFrame, in merge precedence
+    order (later sources override earlier ones). A youth's value for a field
+    comes from the last source that has a row for them and the column, even
+    when that value is empty. This matches merge_source_records' dict
+    updates. Returns (available, present, by_source, names):
+
+    - `available` is a bool frame of youths x fields for the merged record.
+    - `present` is a bool frame of youths x sources.
+    - `by_source` maps source name -> youths x fields availability in that
+      source alone.
+    - `names` holds each youth's merged name.
+    """
+    frames = {name: _keyed(df) for name, df in sources.items()}
+    index = pd.Index(
+        pd.unique(pd.concat([pd.Series(frame.index, dtype=object) for frame in frames.values()])),
+        name=ID_FIELD,
+    )
+    present = pd.DataFrame({name: index.isin(frame.index) for name, frame in frames.items()}, index=index)
+
+    # Blankness is computed on each source's own rows, then aligned once per source
+    blanks = {
+        name: pd.DataFrame(
+            {field: _blank(frame[field]) for field in fields if field in frame.columns}, index=frame.index
+        ).reindex(index, fill_value=True)
+        for name, frame in frames.items()
+    }
+
+    merged_blank, by_source = {}, {name: {} for name in frames}
+    for field in fields:
+        blank = pd.Series(True, index=index)
+        for name, source_blank in blanks.items():
+            if field not in source_blank.columns:
+                by_source[name][field] = pd.Series(False, index=index)
+                continue
+            blank = blank.mask(present[name], source_blank[field])
+            by_source[name][field] = present[name] & ~source_blank[field]
+        merged_blank[field] = blank
+
+    available = pd.DataFrame({field: ~blank for field, blank in merged_blank.items()}, index=index)
+    if ID_FIELD in available.columns:
+        # merge_source_records always writes the Medical ID back
+        available[ID_FIELD] = True
+    if "Case Notes" in available.columns:
+        notes = _case_notes(frames, present, note_keys)
+        # Compared unstripped, as is_field_missing does: " none " counts as notes
+        placeholder = notes.astype(str).str.lower().isin(NOTE_PLACEHOLDERS)
+        available["Case Notes"] = ~(_blank(notes) | placeholder)
+
+    by_source = {name: pd.DataFrame(columns, index=index) for name, columns in by_source.items()}
+    names = pd.Series(None, index=index, dtype=object)
+    for name, frame in frames.items():
+        if NAME_FIELD in frame.columns:
+            names = names.mask(present[name], frame[NAME_FIELD].reindex(index))
+    return available, present, by_source, names
+
+
+def _percent(part, whole):
+    return round(100.0 * part / whole, 2) if whole else 0.0
+
+
+def summarize(available, present, by_source):
+    """Per-field, per-source and overall coverage percentages."""
+    youths = len(available)
+    field_counts = available.sum()
+    return {
+        "youths": youths,
+        "fields": len(available.columns),
+        "overall_coverage": _percent(int(field_counts.sum()), youths * len(available.columns)),
+        "complete_youths": int(available.all(axis=1).sum()),
+        "sources": {
+            name: {
+                "youths": int(present[name].sum()),
+                "coverage": _percent(int(present[name].sum()), youths),
+                "field_coverage": _percent(int(frame.values.sum()), youths * len(frame.columns)),
+            }
+            for name, frame in by_source.items()
+        },
+        "by_field": [
+            {
+                "field": field,
+                "available": int(field_counts[field]),
+                "coverage": _percent(int(field_counts[field]), youths),
+                "by_source": {name: _percent(int(frame[field].sum()), youths) for name, frame in by_source.items()},
+            }
+            for field in available.columns
+        ],
+    }
+
+
+def missing_fields(available, present, names):
+    """One row per (youth, missing field), with the sources the youth was found in."""
+    stacked = (~available).stack()
+    missing = stacked[stacked].index.to_frame(index=False, name=[ID_FIELD, "Field"])
+    found_in = pd.Series("", index=present.index)
+    for name in present.columns:
+        found_in = found_in + present[name].map({True: f"{name},", False: ""})
+    found_in = found_in.str.rstrip(",")
+    missing.insert(1, NAME_FIELD, names.reindex(missing[ID_FIELD]).values)
+    missing["Sources"] = found_in.reindex(missing[ID_FIELD]).values
+    return missing
+
+
+def compute_completeness():
+    """
+    Read every source in full, merge them and compute completeness for the
+    whole population. Returns (summary, missing): the coverage summary
+    dict and the missing-data list as a DataFrame.
+
+    A source that fails to load is computed as empty and listed in
+    `summary["unavailable_sources"]` (its entry in `summary["sources"]` has
+    status "unavailable"), so an outage never reads as 0% coverage.
+    """
+    from src.reentry_care_plan import (
+        get_roster, read_cloud_sql_all, read_bigquery_all, normalize_columns,
+        SOURCE_FETCHERS, DISPLAY_ORDER_REENTRY, CASE_NOTE_KEYS,
+    )
+
+    started = time.perf_counter()
+    loaders = {
+        "excel": get_roster,
+        "sql": lambda: normalize_columns(read_cloud_sql_all()),
+        "bigquery": lambda: normalize_columns(read_bigquery_all()),
+    }
+    sources, unavailable = {}, []
+    for name, _ in SOURCE_FETCHERS:
+        try:
+            sources[name] = loaders[name]()
+        except Exception as e:
+            logger.warning(f"⚠️ Completeness: {name} could not be read: {e}")
+            sources[name] = pd.DataFrame()
+            unavailable.append(name)
+    loaded = time.perf_counter()
+
+    available, present, by_source, names = availability(sources, DISPLAY_ORDER_REENTRY, CASE_NOTE_KEYS)
+    summary = summarize(available, present, by_source)
+    missing = missing_fields(available, present, names)
+    summary["missing_cells"] = len(missing)
+    summary["unavailable_sources"] = unavailable
+    for name, source in summary["sources"].items():
+        source["status"] = "unavailable" if name in unavailable else "ok"
+    summary["computed_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    summary["seconds"] = {
+        "load": round(loaded - started, 3),
+        "compute": round(time.perf_counter() - loaded, 3),
+    }
+    return summary, missing
+
+
+_flight = SingleFlight("completeness")
+_latest = None
+
+
+def cached_completeness(max_age=300.0):
+    """
+    compute_completeness(), reusing a result up to `max_age` seconds old.
+    Concurrent callers share one computation. A result with unavailable
+    sources is returned but not reused, so the next call retries them.
+    """
+    latest = _latest
+    if latest is not None and time.monotonic() - latest[0] <= max_age:
+        return latest[1], latest[2]
+
+    def compute():
+        global _latest
+        summary, missing = compute_completeness()
+        if not summary["unavailable_sources"]:
+            _latest = (time.monotonic(), summary, missing)
+        return summary, missing
+
+    return _flight.do("all", compute)
+
+
+def write_missing(missing, path):
+    """Write the missing-data list as CSV or Parquet, chosen by the file extension."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.endswith(".parquet"):
+        missing.to_parquet(path, index=False)
+    else:
+        missing.to_csv(path, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.completeness",
+        description="Report data completeness across the whole roster (Excel, Cloud SQL and BigQuery merged).",
+    )
+    parser.add_argument("--missing", action="append", default=[],
+                        help="write the missing-data list here (.csv or .parquet); may repeat")
+    parser.add_argument("--summary", help="write the JSON summary here instead of stdout")
+    args = parser.parse_args(argv)
+
+    summary, missing = compute_completeness()
+    for path in args.missing:
+        write_missing(missing, path)
+        print(f"✅ {len(missing)} missing fields written to {path}")
+
+    output = json.dumps(summary, indent=2)
+    if args.summary:
+        with open(args.summary, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    if summary["unavailable_sources"]:
+        print(f"⚠️ Unavailable sources: {', '.join(summary['unavailable_sources'])}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def document_key(*parts):
+    """Stable content hash of the JSON-serializable inputs a document depends on."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DocumentCache:
+    """
+    Content-addressed cache of rendered .docx bytes.
+
+    Entries live in a size-bounded in-memory LRU; entries evicted from memory
+    spill to `disk_dir` (also size-bounded, oldest first), and a disk hit is
+    promoted back into memory. Keys are content hashes, so entries never go
+    stale: a changed record or template simply produces a different key.
+    What the key cannot see (the rendering code itself) is covered by
+    `version`: the disk tier is wiped when it was written by another version.
+
+    The disk directory is only touched on first use, never at construction.
+    """
+
+    VERSION_FILE = "VERSION"
+
+    def __init__(self, max_memory_bytes=64 * 2**20, disk_dir=None, max_disk_bytes=512 * 2**20, version=""):
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.version = str(version)
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = OrderedDict()  # key -> size, oldest first
+        self._disk_bytes = 0
+        self._disk_loaded = not disk_dir
+        self._lock = threading.Lock()
+        self._disk_load_lock = threading.Lock()
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.docx")
+
+    def _ensure_disk_index(self):
+        """Scan the disk tier once, wiping it first if another render version wrote it."""
+        if self._disk_loaded:
+            return
+        with self._disk_load_lock:
+            if self._disk_loaded:
+                return
+            try:
+                self._load_disk_index()
+            except OSError as e:
+                logger.warning(f"⚠️ Rendered document disk cache unavailable: {e}")
+            self._disk_loaded = True
+
+    def _load_disk_index(self):
+        os.makedirs(self.disk_dir, exist_ok=True)
+        version_path = os.path.join(self.disk_dir, self.VERSION_FILE)
+        try:
+            with open(version_path) as f:
+                current = f.read().strip() == self.version
+        except FileNotFoundError:
+            current = False
+
+        entries = []
+        for entry in os.scandir(self.disk_dir):
+            if not entry.name.endswith((".docx", ".tmp")):
+                continue
+            if not current or entry.name.endswith(".tmp"):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, entry.name[:-len(".docx")], stat.st_size))
+        if not current:
+            with open(version_path, "w") as f:
+                f.write(self.version + "\n")
+
+        with self._lock:
+            for _, key, size in sorted(entries):
+                if key not in self._disk:
+                    self._disk[key] = size
+                    self._disk_bytes += size
+
+    def get(self, key):
+        """Cached bytes for `key`, or None."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self._counts["memory_hits"] += 1
+                return data
+        self._ensure_disk_index()
+        with self._lock:
+            if key not in self._disk:
+                self._counts["misses"] += 1
+                return None
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self._drop_disk(key)
+                self._counts["misses"] += 1
+            return None
+        with self._lock:
+            self._counts["disk_hits"] += 1
+            spills = self._store_memory(key, data)
+        self._spill_all(spills)
+        return data
+
+    def put(self, key, data):
+        with self._lock:
+            spills = self._store_memory(key, bytes(data))
+        self._spill_all(spills)
+
+    def _store_memory(self, key, data):
+        """Add to the memory tier; returns the (key, data) entries to spill to disk."""
+        if len(data) > self.max_memory_bytes:
+            return [(key, data)]
+        spills = []
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            old_key, old_data = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old_data)
+            self._counts["evictions"] += 1
+            spills.append((old_key, old_data))
+        return spills
+
+    def _spill_all(self, spills):
+        # File I/O happens here, outside self._lock, so lookups never wait on disk
+        if not spills or not self.disk_dir:
+            return
+        self._ensure_disk_index()
+        for key, data in spills:
+            self._spill(key, data)
+
+    def _spill(self, key, data):
+        with self._lock:
+            if key in self._disk or len(data) > self.max_disk_bytes:
+                return
+        try:
+            tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"⚠️ Could not spill rendered document to disk: {e}")
+            return
+        removed = []
+        with self._lock:
+            if key not in self._disk:
+                self._disk[key] = len(data)
+                self._disk_bytes += len(data)
+            while self._disk_bytes > self.max_disk_bytes:
+                old_key = next(iter(self._disk))
+                self._drop_disk(old_key)
+                removed.append(old_key)
+        for old_key in removed:
+            try:
+                os.remove(self._path(old_key))
+            except FileNotFoundError:
+                pass
+
+    def _drop_disk(self, key):
+        size = self._disk.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    def clear(self):
+        self._ensure_disk_index()
+        with self._lock:
+            keys = list(self._disk)
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._disk.clear()
+            self._disk_bytes = 0
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+        return len(keys)
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+            lookups = counts["memory_hits"] + counts["disk_hits"] + counts["misses"]
+            return {
+                **counts,
+                "hit_ratio": round((counts["memory_hits"] + counts["disk_hits"]) / lookups, 4) if lookups else None,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
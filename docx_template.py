@@ -0,0 +1,84 @@
+import copy
+import os
+import threading
+from io import BytesIO
+
+from src.tracing import span
+
+TEMPLATE_PATH = "data/Template.docx"
+
+
+class DocxTemplate:
+    """
+    Parses the Word template once and keeps pre-built report skeletons.
+
+    A skeleton is the template plus everything that does not depend on the
+    youth (title paragraph, header row, labeled field rows, borders, fonts).
+    Each thread opens a skeleton's package once and reuses it: `clone()`
+    swaps a deep copy of the skeleton's <w:body> into that package, so a
+    request copies one element tree instead of unzipping and parsing the
+    whole .docx. The returned document is only valid until the same thread
+    clones the same kind again (callers save it right away). The template is
+    re-parsed when the file on disk changes.
+    """
+
+    def __init__(self, path=TEMPLATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature = None
+        self._skeletons = {}
+        self._local = threading.local()
+
+    def _file_signature(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Template file not found at: {self.path}")
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def version(self):
+        """Opaque value that changes whenever the template file changes."""
+        return self._file_signature()
+
+    def clone(self, kind, build):
+        """
+        Return (document, layout) for report `kind`, holding a fresh copy of
+        its skeleton. `build(doc)` is called once per template version to add
+        the static parts to a freshly parsed template; it returns a layout
+        dict (e.g. paragraph/table indexes) describing where values go.
+        """
+        from docx import Document
+
+        signature = self._file_signature()
+        with self._lock:
+            if signature != self._signature:
+                self._skeletons = {}
+                self._signature = signature
+            entry = self._skeletons.get(kind)
+            if entry is None:
+                with span("template_load"):
+                    doc = Document(self.path)
+                    layout = build(doc)
+                    buffer = BytesIO()
+                    doc.save(buffer)
+                entry = (buffer.getvalue(), doc.element.body, layout)
+                self._skeletons[kind] = entry
+        package_bytes, body, layout = entry
+
+        packages = getattr(self._local, "packages", None)
+        if packages is None:
+            packages = self._local.packages = {}
+        cached = packages.get(kind)
+        if cached is None or cached[0] is not entry:
+            with span("template_open"):
+                cached = packages[kind] = (entry, Document(BytesIO(package_bytes)))
+        doc = cached[1]
+        with span("template_clone"):
+            doc.element.replace(doc.element.body, copy.deepcopy(body))
+            # python-docx caches a proxy for the <w:body> it first saw
+            doc._Document__body = None
+        return doc, dict(layout)
+
+    def preload(self, builders):
+        """Build the skeletons for {kind: build} ahead of the first request."""
+        for kind, build in builders.items():
+            self.clone(kind, build)
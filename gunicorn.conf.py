@@ -0,0 +1,120 @@
+"""
+Production entry point:
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The app and the shared read-only data (roster, report skeletons, frontend
+bundle) are loaded once in the master and frozen out of the garbage
+collector before forking, so workers share those pages copy-on-write
+instead of each parsing the roster. Each worker then opens its own
+SQL/BigQuery connections and starts its own background threads (search
+index, output sweeper, HRA jobs).
+
+Workers still coordinate through files: /cache/invalidate is broadcast
+through an invalidation log under data/ that every worker polls before
+serving lookups, and with SEARCH_INDEX_PATH set the search index is built
+by one worker per refresh and loaded by the rest (the file lists every
+youth, so point it at a private directory).
+
+SERVE_PROFILE picks timeouts and recycling for the traffic a pool serves:
+
+- "api": the fast JSON endpoints (candidate search, reports, cache stats).
+- "hra": /generate_hra_* and /jobs/*, where a request or background job can
+  run for minutes. HRA jobs left unfinished by a previous server are marked
+  failed when this pool starts.
+- "all" (default): one pool for everything, sized for the slow endpoints.
+
+To tune them separately, run one pool per profile on its own port and route
+the HRA paths to the "hra" pool at the load balancer:
+
+    SERVE_PROFILE=api PORT=5000 gunicorn -c gunicorn.conf.py app:app
+    SERVE_PROFILE=hra PORT=5001 GUNICORN_WORKERS=1 gunicorn -c gunicorn.conf.py app:app
+
+The current HRA model writes one fixed output file, so HRA runs are
+serialized across every worker; more "hra" workers (or HRA_JOB_WORKERS)
+only help once the model writes to the sink it is given.
+
+Every setting below can also be overridden on the gunicorn command line.
+"""
+import gc
+import os
+
+HRA_JOB_TIMEOUT = float(os.environ.get("HRA_JOB_TIMEOUT", "600"))
+
+# gthread workers heartbeat from their main loop, so `timeout` catches a
+# wedged worker rather than bounding one slow request; per-request budgets
+# come from SOURCE_TIMEOUT_* and HRA_JOB_TIMEOUT. `graceful_timeout` is how
+# long a restarting worker waits for in-flight requests and HRA jobs.
+PROFILES = {
+    "api": {"timeout": 60, "graceful_timeout": 30, "keepalive": 15, "max_requests": 2000},
+    "hra": {"timeout": HRA_JOB_TIMEOUT + 60, "graceful_timeout": HRA_JOB_TIMEOUT, "keepalive": 2, "max_requests": 200},
+    "all": {"timeout": HRA_JOB_TIMEOUT + 60, "graceful_timeout": HRA_JOB_TIMEOUT, "keepalive": 5, "max_requests": 1000},
+}
+SERVE_PROFILE = os.environ.get("SERVE_PROFILE", "all")
+if SERVE_PROFILE not in PROFILES:
+    raise ValueError(f"SERVE_PROFILE must be one of {sorted(PROFILES)}, not {SERVE_PROFILE!r}")
+profile = PROFILES[SERVE_PROFILE]
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+worker_class = "gthread"
+workers = int(os.environ.get("GUNICORN_WORKERS", str(max(2, os.cpu_count() or 1))))
+# Requests mostly wait on Cloud SQL, BigQuery and the HRA model, so each
+# worker serves several at once
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", profile["timeout"]))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", profile["graceful_timeout"]))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", profile["keepalive"]))
+
+# Recycle workers periodically to cap memory growth (pandas and python-docx
+# fragment the heap); the jitter keeps workers from restarting together
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", profile["max_requests"]))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", max(max_requests // 10, 1)))
+
+preload_app = True
+# Heartbeat files on tmpfs, so a slow disk cannot make workers look hung
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# The app writes its own structured request log (src/logging_setup.py)
+accesslog = None
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported and before any worker forks
+    import app
+    from src.reentry_care_plan import preload_shared
+    preload_shared()
+    app.asset_pipeline.manifest()
+    if not os.environ.get("BATCH_RENDER_PROCESSES"):
+        # Every worker gets its own render pool; split the cores between them
+        app.BATCH_RENDER_PROCESSES = app.default_render_processes(server.cfg.workers)
+    if SERVE_PROFILE in ("hra", "all"):
+        # Only the pool that runs HRA jobs may fail the ones left unfinished
+        app.recover_interrupted_jobs()
+    server.log.info(f"Preloaded shared data; serving profile {SERVE_PROFILE!r}")
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far out of the collector's reach: a GC pass
+    # in a worker would otherwise touch (and so copy) every shared page
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Threads and connections inherited from the master are unusable here
+    from src.logging_setup import restart_after_fork
+    from src.reentry_care_plan import reset_after_fork
+    restart_after_fork()
+    reset_after_fork()
+
+
+def post_worker_init(worker):
+    import app
+    app.start_background_work()
+
+
+def worker_exit(server, worker):
+    import app
+    app.stop_background_work(timeout=worker.cfg.graceful_timeout)
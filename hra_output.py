@@ -0,0 +1,232 @@
+import inspect
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from io import BytesIO
+
+logger = logging.getLogger(__name__)
+
+# Where the HRA model writes its document when it cannot be told otherwise
+LEGACY_OUTPUT_PATH = "data/output.docx"
+HRA_OUTPUT_ROOT = os.environ.get("HRA_OUTPUT_ROOT", os.path.join(tempfile.gettempdir(), "serrano_hra"))
+# How long a legacy model run waits for the shared output path before failing;
+# a run abandoned by its job's timeout must not block every later one
+LEGACY_LOCK_TIMEOUT = float(os.environ.get("HRA_LOCK_TIMEOUT", "300"))
+
+
+class MemorySink:
+    """Output sink backed by an in-memory buffer; nothing touches the disk."""
+
+    def __init__(self):
+        self.buffer = BytesIO()
+
+    def write(self, data):
+        self.buffer.write(data)
+
+    def read_bytes(self):
+        return self.buffer.getvalue()
+
+    def cleanup(self):
+        self.buffer = BytesIO()
+
+
+class TempDirSink:
+    """
+    Output sink backed by a unique directory under `root`, for model code
+    that can only write to a file path. `cleanup()` removes the directory;
+    anything left behind is removed by the sweeper.
+    """
+
+    def __init__(self, root=HRA_OUTPUT_ROOT, filename="output.docx"):
+        os.makedirs(root, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix="hra_", dir=root)
+        self.path = os.path.join(self.directory, filename)
+
+    def write(self, data):
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+    def read_bytes(self):
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def cleanup(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+@contextmanager
+def file_lock(path, timeout=None, poll_interval=0.1):
+    """
+    Exclusive lock on `path` that also holds across worker processes.
+    Raises TimeoutError if it is not acquired within `timeout` seconds
+    (None waits forever).
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if os.name == "nt":
+        import msvcrt
+
+        def try_lock(handle):
+            handle.seek(0)
+            try:
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                return False
+
+        def unlock(handle):
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+
+        def try_lock(handle):
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                return False
+
+        def unlock(handle):
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with open(path, "a+b") as handle:
+        while not try_lock(handle):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out after {timeout:g}s waiting for {path}")
+            time.sleep(poll_interval)
+        try:
+            yield
+        finally:
+            unlock(handle)
+
+
+def _accepts(func, name):
+    try:
+        parameters = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+    return name in parameters or any(p.kind is p.VAR_KEYWORD for p in parameters.values())
+
+
+def run_hra_model(model, selected_fields, candidate_name, sink, legacy_path=LEGACY_OUTPUT_PATH,
+                  lock_timeout=LEGACY_LOCK_TIMEOUT):
+    """
+    Run the HRA `model` so its document ends up in `sink` and return the
+    document bytes.
+
+    A model that takes an `output_file` keyword writes into a MemorySink's
+    buffer; one that takes `output_path` writes into a file of its own, so
+    calls never share a path. Older model code that always writes
+    `legacy_path` is serialized with a cross-process lock and its file is
+    read and removed before the lock is released; waiting longer than
+    `lock_timeout` seconds for that lock raises TimeoutError.
+    """
+    if isinstance(sink, MemorySink) and _accepts(model, "output_file"):
+        result = model(selected_fields, candidate_name, output_file=sink.buffer)
+        if not isinstance(result, dict):
+            raise RuntimeError(f"Failed to generate HRA: {result}")
+        return sink.read_bytes()
+
+    if _accepts(model, "output_path"):
+        staging = sink if isinstance(sink, TempDirSink) else TempDirSink()
+        try:
+            result = model(selected_fields, candidate_name, output_path=staging.path)
+            _check_result(result, staging.path)
+            data = staging.read_bytes()
+        finally:
+            if staging is not sink:
+                staging.cleanup()
+        if staging is not sink:
+            sink.write(data)
+        return data
+
+    with file_lock(f"{legacy_path}.lock", timeout=lock_timeout):
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)  # never pick up a previous request's document
+        result = model(selected_fields, candidate_name)
+        _check_result(result, legacy_path)
+        with open(legacy_path, "rb") as f:
+            data = f.read()
+        os.remove(legacy_path)
+    sink.write(data)
+    return data
+
+
+def _check_result(result, path):
+    if not isinstance(result, dict):
+        raise RuntimeError(f"Failed to generate HRA: {result}")
+    if not os.path.exists(path):
+        raise RuntimeError("Document generation failed - output file not created")
+
+
+def sweep(directory, max_age, max_entries=None, now=None):
+    """
+    Remove entries of `directory` older than `max_age` seconds, then the
+    oldest ones beyond `max_entries`. Returns the number removed.
+    """
+    if not os.path.isdir(directory):
+        return 0
+    now = now or time.time()
+    entries = []
+    for entry in os.scandir(directory):
+        try:
+            entries.append((entry.stat().st_mtime, entry.path, entry.is_dir(follow_symlinks=False)))
+        except FileNotFoundError:
+            continue
+    entries.sort(reverse=True)  # newest first
+
+    removed = 0
+    for position, (mtime, path, is_dir) in enumerate(entries):
+        expired = now - mtime > max_age
+        over_limit = max_entries is not None and position >= max_entries
+        if not (expired or over_limit):
+            continue
+        try:
+            if is_dir:
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+class OutputSweeper:
+    """Background thread that applies `sweep()` to a set of directories."""
+
+    def __init__(self, directories, max_age=3600.0, max_entries=500, interval=300.0):
+        self.directories = list(directories)
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.interval = interval
+        self.removed = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        removed = sum(sweep(d, self.max_age, self.max_entries) for d in self.directories)
+        self.removed += removed
+        return removed
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning(f"⚠️ Output sweep failed: {e}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="output-sweeper", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
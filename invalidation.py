@@ -0,0 +1,92 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS invalidations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    medical_id TEXT,
+    created_at REAL NOT NULL
+)
+"""
+
+
+class InvalidationLog:
+    """
+    Cache invalidations shared by every worker process through SQLite.
+
+    `publish(medical_id)` appends an entry (None meaning "everything");
+    `poll()` returns the entries other processes (or this one) appended since
+    the last poll, at most once per `poll_interval` seconds, so each worker
+    can drop the same records from its own in-process caches. Entries older
+    than `retention` seconds are pruned. The database holds Medical IDs, so
+    it is created owner-only, and only opened on first use, never at
+    construction.
+    """
+
+    def __init__(self, db_path="data/invalidations.sqlite3", poll_interval=1.0, retention=3600.0):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._ready = False
+        self._last_seq = None
+        self._next_poll = 0.0
+
+    @contextmanager
+    def _db(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            os.close(os.open(self.db_path, os.O_RDWR | os.O_CREAT, 0o600))
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                if not self._ready:
+                    conn.execute(_SCHEMA)
+                    self._ready = True
+                yield conn
+        finally:
+            conn.close()
+
+    def publish(self, medical_id=None):
+        """Record an invalidation for one Medical ID (or all of them when None)."""
+        now = time.time()
+        with self._db() as conn:
+            conn.execute(
+                "INSERT INTO invalidations (medical_id, created_at) VALUES (?, ?)",
+                (None if medical_id is None else str(medical_id), now),
+            )
+            conn.execute("DELETE FROM invalidations WHERE created_at < ?", (now - self.retention,))
+
+    def poll(self, force=False):
+        """
+        Medical IDs invalidated since the last poll (None for "everything").
+        Returns [] without touching the database between poll intervals.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and now < self._next_poll:
+                return []
+            self._next_poll = now + self.poll_interval
+            try:
+                with self._db() as conn:
+                    if self._last_seq is None:
+                        # Start from the current end: older entries predate this process's caches
+                        row = conn.execute("SELECT MAX(seq) FROM invalidations").fetchone()
+                        self._last_seq = row[0] or 0
+                        return []
+                    rows = conn.execute(
+                        "SELECT seq, medical_id FROM invalidations WHERE seq > ? ORDER BY seq",
+                        (self._last_seq,),
+                    ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Could not read cache invalidations: {e}")
+                return []
+            if rows:
+                self._last_seq = rows[-1][0]
+            return [medical_id for _, medical_id in rows]
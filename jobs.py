@@ -0,0 +1,260 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed_out"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED, TIMED_OUT)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    params TEXT NOT NULL,
+    result_path TEXT,
+    error TEXT,
+    timeout REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+)
+"""
+
+
+class JobContext:
+    """Handed to a job handler so it can report progress and notice cancellation."""
+
+    def __init__(self, queue, job_id, params):
+        self._queue = queue
+        self.job_id = job_id
+        self.params = params
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def progress(self, fraction, message=None):
+        if not self.cancelled:
+            self._queue._update(self.job_id, progress=max(0.0, min(1.0, fraction)), message=message)
+
+
+class JobQueue:
+    """
+    Background job runner with state persisted in SQLite.
+
+    Handlers are registered per job kind as `handler(params, ctx) -> bytes`
+    and run on a bounded thread pool. The returned document is written to
+    `result_dir/<job_id>.docx`. Each job has a timeout, capped at
+    `max_timeout` (default: `default_timeout`); a job that overruns it (or is
+    cancelled while running) is marked as such and its eventual result is
+    discarded. A handler cannot be interrupted, so an overrunning one keeps
+    its slot until it actually returns: at most `max_workers` handlers ever
+    run at once. Jobs left queued or running by a stopped server cannot be
+    resumed; `recover_interrupted()` marks them failed. Only the process
+    that owns the queue should call it (with `recover=True` it runs at
+    construction), since another pool sharing the database would otherwise
+    fail jobs that are still running there.
+    """
+
+    def __init__(self, db_path="data/jobs.sqlite3", result_dir="data/jobs",
+                 max_workers=2, default_timeout=600.0, max_timeout=None, recover=True):
+        self.db_path = db_path
+        self.result_dir = result_dir
+        self.default_timeout = default_timeout
+        self.max_timeout = max_timeout or default_timeout
+        self._handlers = {}
+        self._futures = {}
+        self._contexts = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._stopping = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        os.makedirs(result_dir, exist_ok=True)
+        with self._db() as conn:
+            conn.execute(_SCHEMA)
+        if recover:
+            self.recover_interrupted()
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _update(self, job_id, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._db() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def _start(self, job_id):
+        """Move a job from queued to running; False if it was cancelled meanwhile."""
+        with self._lock, self._db() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?",
+                (RUNNING, time.time(), job_id, QUEUED),
+            )
+            return cursor.rowcount == 1
+
+    def _finish(self, job_id, status, **fields):
+        """Move a job to a final state unless it already reached one."""
+        with self._lock, self._db() as conn:
+            columns = ", ".join(f"{name} = ?" for name in ("status", "finished_at", *fields))
+            cursor = conn.execute(
+                f"UPDATE jobs SET {columns} WHERE id = ? AND status NOT IN ({', '.join('?' * len(FINISHED_STATES))})",
+                (status, time.time(), *fields.values(), job_id, *FINISHED_STATES),
+            )
+            return cursor.rowcount == 1
+
+    def recover_interrupted(self):
+        """Mark jobs a previous server left queued or running as failed. Returns how many."""
+        with self._lock, self._db() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status IN (?, ?)",
+                (FAILED, "interrupted by server restart", time.time(), QUEUED, RUNNING),
+            )
+            return cursor.rowcount
+
+    def register(self, kind, handler):
+        self._handlers[kind] = handler
+
+    def submit(self, kind, params, timeout=None):
+        """Queue a job and return its ID."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        timeout = min(timeout, self.max_timeout) if timeout and timeout > 0 else self.default_timeout
+        with self._lock, self._db() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, timeout, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(params), timeout, time.time()),
+            )
+        context = JobContext(self, job_id, params)
+        with self._lock:
+            self._contexts[job_id] = context
+            self._futures[job_id] = self._executor.submit(self._run, kind, context, timeout)
+        return job_id
+
+    def _run(self, kind, context, timeout):
+        job_id = context.job_id
+        try:
+            if context.cancelled:
+                return
+            if not self._acquire_slot(context):
+                if self._stopping.is_set():
+                    self._finish(job_id, FAILED, error="interrupted by server shutdown")
+                return
+            if not self._start(job_id):
+                self._slots.release()  # cancelled while waiting for a slot
+                return
+
+            outcome = {}
+
+            def target():
+                try:
+                    outcome["result"] = self._handlers[kind](context.params, context)
+                except Exception as e:
+                    outcome["error"] = e
+                finally:
+                    # Released by the handler thread itself, so one that
+                    # outlives its timeout still counts against max_workers
+                    self._slots.release()
+
+            worker = threading.Thread(target=target, name=f"job-{job_id[:8]}", daemon=True)
+            worker.start()
+            worker.join(timeout)
+            if worker.is_alive():
+                context._cancelled.set()
+                self._finish(job_id, TIMED_OUT, error=f"exceeded {timeout:.0f}s")
+            elif context.cancelled:
+                pass  # already marked cancelled; discard whatever came back
+            elif "error" in outcome:
+                self._finish(job_id, FAILED, error=str(outcome["error"]))
+            else:
+                path = os.path.join(self.result_dir, f"{job_id}.docx")
+                with open(path, "wb") as f:
+                    f.write(outcome["result"])
+                if not self._finish(job_id, SUCCEEDED, progress=1.0, result_path=path):
+                    os.remove(path)
+        finally:
+            self._forget(job_id)
+
+    def _acquire_slot(self, context):
+        """Wait for a free handler slot; False if the job is cancelled or the queue stops first."""
+        while not self._slots.acquire(timeout=1.0):
+            if context.cancelled or self._stopping.is_set():
+                return False
+        return True
+
+    def _forget(self, job_id):
+        with self._lock:
+            self._futures.pop(job_id, None)
+            self._contexts.pop(job_id, None)
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job. Returns False if it already finished."""
+        with self._lock:
+            future = self._futures.get(job_id)
+            context = self._contexts.get(job_id)
+        if context is not None:
+            context._cancelled.set()
+        if future is not None and future.cancel():
+            # Never started, so _run's cleanup will not run either
+            self._forget(job_id)
+        return self._finish(job_id, CANCELLED)
+
+    def get(self, job_id):
+        """Job state as a dict, or None for an unknown ID."""
+        with self._db() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        return job
+
+    def counts(self):
+        with self._db() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def shutdown(self, timeout=None):
+        """
+        Stop accepting jobs and wait up to `timeout` seconds for running ones
+        to finish (e.g. before a server worker exits). Jobs still queued or
+        running after that are marked failed rather than left running forever.
+        """
+        self._stopping.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            futures = list(self._futures.items())
+        for job_id, future in futures:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                future.result(timeout=remaining)
+            except Exception:
+                pass
+        with self._lock:
+            unfinished = list(self._futures)
+        for job_id in unfinished:
+            self._finish(job_id, FAILED, error="interrupted by server shutdown")
+        return len(unfinished)
@@ -0,0 +1,158 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import math
+import os
+import queue
+import random
+import sys
+import time
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")  # "json" or "text"
+# Fraction of DEBUG payload records (inputs, candidate lists, merged records) kept
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get("LOG_DEBUG_SAMPLE_RATE", "0.01"))
+# Log merged record values verbatim instead of redacting them (local debugging only)
+LOG_PHI = os.environ.get("LOG_PHI", "false").lower() in ("1", "true", "yes")
+# `extra=` fields that carry what a user typed or found (names, Medical IDs,
+# addresses); their values are replaced before any record is written
+PHI_FIELDS = frozenset({"candidate_name", "query", "candidates"})
+
+_request_id = contextvars.ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+_listener = None
+
+
+def set_request_id(request_id):
+    _request_id.set(request_id)
+
+
+def get_request_id():
+    return _request_id.get()
+
+
+def redact_record(record):
+    """
+    PHI-safe view of a merged youth record: field names with whether a
+    value is present, never the value itself (unless LOG_PHI is set).
+    """
+    if LOG_PHI:
+        return {str(k): str(v) for k, v in record.items()}
+    redacted = {}
+    for key, value in record.items():
+        missing = value is None or (isinstance(value, float) and math.isnan(value)) or str(value).strip() in ("", "nan")
+        redacted[str(key)] = "<missing>" if missing else "<redacted>"
+    return redacted
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps the current request ID on records; runs in the thread that logged."""
+
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+class PhiFilter(logging.Filter):
+    """Redacts PHI_FIELDS on every record (unless LOG_PHI is set)."""
+
+    def filter(self, record):
+        if not LOG_PHI:
+            for key in PHI_FIELDS.intersection(vars(record)):
+                setattr(record, key, "<redacted>")
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Keep only a `rate` fraction of DEBUG records; other levels always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno != logging.DEBUG or random.random() < self.rate
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Like QueueHandler, but keeps the traceback in exc_text instead of the message."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the message, request ID and any `extra` fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, debug_sample_rate=LOG_DEBUG_SAMPLE_RATE, stream=None):
+    """
+    Route all logging through a queue so request threads never block on
+    stdout: records are enqueued by a QueueHandler and written by a
+    QueueListener thread. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if fmt == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+    records = queue.SimpleQueue()
+    handler = _QueueHandler(records)
+    handler.addFilter(RequestContextFilter())
+    handler.addFilter(PhiFilter())
+    handler.addFilter(DebugSampler(debug_sample_rate))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
+
+
+def restart_after_fork(**kwargs):
+    """
+    Start a new listener in a forked worker: the parent's listener thread does
+    not survive the fork, so records queued in the child would never be written.
+    """
+    global _listener
+    if _listener is not None:
+        atexit.unregister(_listener.stop)
+        _listener = None
+    return configure_logging(**kwargs)
@@ -0,0 +1,144 @@
+import re
+import threading
+import zipfile
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+DOCUMENT_PART = "word/document.xml"
+
+# Placeholders written into the skeleton before it is serialized. Text slots
+# replace the whole <w:t> element (values may need <w:br/>/<w:tab/>);
+# attribute slots (border colors) replace just the attribute value.
+_TEXT_SLOT = "@@{}@@"
+_SLOT_PATTERN = re.compile(r"(<w:t>@@(?:TITLE|VALUE_\d+)@@</w:t>|@@BORDER_\d+@@)")
+
+# Characters XML 1.0 cannot represent at all
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def value_slot(index):
+    return _TEXT_SLOT.format(f"VALUE_{index}")
+
+
+def border_slot(index):
+    return _TEXT_SLOT.format(f"BORDER_{index}")
+
+
+TITLE_SLOT = _TEXT_SLOT.format("TITLE")
+
+
+def run_content_xml(text):
+    """
+    Serialize run text the way python-docx's `run.text = ...` does: tabs become
+    <w:tab/>, line breaks <w:br/>, and text segments with leading or trailing
+    whitespace get xml:space="preserve".
+    """
+    text = _INVALID_XML_CHARS.sub("", str(text))
+    out = []
+    segment = []
+
+    def flush():
+        if segment:
+            chunk = "".join(segment)
+            space = ' xml:space="preserve"' if chunk != chunk.strip() else ""
+            out.append(f"<w:t{space}>{escape(chunk)}</w:t>")
+            segment.clear()
+
+    for ch in text:
+        if ch == "\t":
+            flush()
+            out.append("<w:tab/>")
+        elif ch in "\r\n":
+            flush()
+            out.append("<w:br/>")
+        else:
+            segment.append(ch)
+    flush()
+    return "".join(out)
+
+
+class CompiledReport:
+    """A serialized report skeleton split into static XML fragments and slots."""
+
+    def __init__(self, docx_bytes):
+        entries = []
+        document_xml = None
+        with zipfile.ZipFile(BytesIO(docx_bytes)) as zf:
+            for info in zf.infolist():
+                data = zf.read(info.filename)
+                if info.filename == DOCUMENT_PART:
+                    document_xml = data.decode("utf-8")
+                entries.append((info, data))
+        if document_xml is None:
+            raise ValueError(f"{DOCUMENT_PART} not found in skeleton")
+        self.entries = entries
+
+        # Alternating [static, slot, static, slot, ..., static]
+        parts = _SLOT_PATTERN.split(document_xml)
+        self.fragments = parts[0::2]
+        self.slots = [
+            slot[len("<w:t>@@"):-len("@@</w:t>")] if slot.startswith("<w:t>") else slot.strip("@")
+            for slot in parts[1::2]
+        ]
+
+    def document_xml(self, values):
+        """Fill slots from `values` (slot name -> text or attribute value)."""
+        pieces = [self.fragments[0]]
+        for slot, fragment in zip(self.slots, self.fragments[1:]):
+            value = values[slot]
+            if slot.startswith("BORDER_"):
+                pieces.append(escape(value, {'"': "&quot;"}))
+            else:
+                pieces.append(run_content_xml(value))
+            pieces.append(fragment)
+        return "".join(pieces)
+
+    def write(self, values, fileobj=None):
+        """Write the filled .docx into `fileobj` (a new BytesIO by default) and return it."""
+        fileobj = fileobj if fileobj is not None else BytesIO()
+        with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zf:
+            for info, data in self.entries:
+                if info.filename == DOCUMENT_PART:
+                    data = self.document_xml(values).encode("utf-8")
+                # writestr mutates the ZipInfo it is given, so never share ours
+                entry = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                entry.external_attr = info.external_attr
+                zf.writestr(entry, data, compress_type=zipfile.ZIP_DEFLATED)
+        if hasattr(fileobj, "seek"):
+            fileobj.seek(0)
+        return fileobj
+
+
+class OoxmlReportWriter:
+    """
+    Fast report backend: serializes each report skeleton once with slot
+    markers and then produces documents by string-joining XML fragments
+    straight into a zip stream, with no python-docx objects per request.
+
+    `prepare(doc, layout)` fills a freshly cloned skeleton with slot markers;
+    it is supplied by the caller so the markup matches the python-docx path.
+    """
+
+    def __init__(self, template):
+        self.template = template
+        self._lock = threading.Lock()
+        self._compiled = {}
+
+    def compiled(self, kind, build, prepare):
+        version = self.template.version()
+        key = (kind, version)
+        compiled = self._compiled.get(key)
+        if compiled is not None:
+            return compiled
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is None:
+                doc, layout = self.template.clone(kind, build)
+                prepare(doc, layout)
+                buffer = BytesIO()
+                doc.save(buffer)
+                compiled = CompiledReport(buffer.getvalue())
+                # Drop versions of the template that are no longer current
+                self._compiled = {k: v for k, v in self._compiled.items() if k[1] == version}
+                self._compiled[key] = compiled
+        return compiled
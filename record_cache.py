@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class RecordCache:
+    """
+    Bounded LRU cache of per-source candidate records keyed by Medical ID.
+
+    Each source's record carries its own timestamp, so a source with a short
+    TTL (e.g. Cloud SQL, which case managers edit) can be re-fetched while the
+    other sources for the same youth are still served from memory.
+    """
+
+    def __init__(self, max_size=512, ttls=None, default_ttl=120.0):
+        self.max_size = max_size
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = {}
+        self._misses = {}
+        self._evictions = 0
+        self._invalidations = 0
+
+    def _ttl(self, source):
+        return self.ttls.get(source, self.default_ttl)
+
+    def get(self, medical_id, sources):
+        """
+        Return (fresh, stale): fresh maps each source with a live cached record
+        to that record, stale lists the sources that must be fetched again.
+        """
+        now = time.monotonic()
+        fresh, stale = {}, []
+        with self._lock:
+            entry = self._entries.get(medical_id)
+            if entry is not None:
+                self._entries.move_to_end(medical_id)
+            for source in sources:
+                cached = entry.get(source) if entry else None
+                if cached is not None and now - cached[0] < self._ttl(source):
+                    fresh[source] = cached[1]
+                    self._hits[source] = self._hits.get(source, 0) + 1
+                else:
+                    stale.append(source)
+                    self._misses[source] = self._misses.get(source, 0) + 1
+        return fresh, stale
+
+    def put(self, medical_id, source, record):
+        """Store one source's record for a Medical ID."""
+        with self._lock:
+            entry = self._entries.setdefault(medical_id, {})
+            entry[source] = (time.monotonic(), record)
+            self._entries.move_to_end(medical_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, medical_id=None):
+        """Drop one Medical ID, or everything when no ID is given. Returns entries removed."""
+        with self._lock:
+            if medical_id is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                removed = 1 if self._entries.pop(medical_id, None) is not None else 0
+            self._invalidations += removed
+            return removed
+
+    def stats(self):
+        with self._lock:
+            sources = sorted(set(self._hits) | set(self._misses) | set(self.ttls))
+            per_source = {}
+            for source in sources:
+                hits = self._hits.get(source, 0)
+                misses = self._misses.get(source, 0)
+                per_source[source] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                    "ttl_seconds": self._ttl(source),
+                }
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "sources": per_source,
+            }
@@ -1,30 +1,54 @@
-import streamlit as st
 import os
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = r"D:\serrano_react\service_account.json"
-import shutil
 from io import BytesIO
 import pandas as pd
-from sqlalchemy import create_engine
-from google.cloud import bigquery
-import pymysql
-from docx import Document
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.shared import RGBColor, Inches, Pt
-from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.oxml.shared import OxmlElement
-from docx.oxml.ns import qn
+from sqlalchemy import create_engine, text, bindparam, inspect as sql_inspect
 from dotenv import load_dotenv
-import traceback
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 import re
+from src.record_cache import RecordCache
+from src.bigquery_access import BigQueryAccess
+from src.snapshot import SnapshotStore, SNAPSHOT_PATH
+from src.docx_template import DocxTemplate, TEMPLATE_PATH
+from src.ooxml_writer import OoxmlReportWriter, TITLE_SLOT, value_slot, border_slot
+from src.document_cache import DocumentCache, document_key
+from src.tracing import span, traced, submit_with_context
+from src.logging_setup import redact_record
+from src.search_index import SearchIndexService
+from src.invalidation import InvalidationLog
+from src.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Heavy or network-bound dependencies (google.cloud, docx, streamlit) are
+# imported where they are used so importing this module stays cheap and
+# performs no I/O; call warm_up() to pay those costs ahead of traffic.
 
 load_dotenv()
 
-# ✅ BigQuery client
-try:
-    client = bigquery.Client()
-except Exception as e:
-    print(f"Could not initialize BigQuery client: {e}")
-    client = None
+# ✅ BigQuery client (created on first use)
+_bq_client = None
+_bq_client_failed = False
+_bq_client_lock = threading.Lock()
+
+def get_bigquery_client():
+    """Shared BigQuery client, or None if it cannot be created."""
+    global _bq_client, _bq_client_failed
+    if _bq_client is not None or _bq_client_failed:
+        return _bq_client
+    with _bq_client_lock:
+        if _bq_client is None and not _bq_client_failed:
+            try:
+                from google.cloud import bigquery
+                _bq_client = bigquery.Client()
+            except Exception as e:
+                logger.warning(f"Could not initialize BigQuery client: {e}")
+                _bq_client_failed = True
+    return _bq_client
 
 # ✅ UI → Actual column names mapping
 CANON_MAP = {
@@ -124,6 +148,8 @@ DISPLAY_ORDER_REENTRY = [
 
 def set_table_borders(table, color_rgb=(0, 0, 0)):
     """Apply borders to a table manually (works even without Word styles)."""
+    from docx.oxml.shared import OxmlElement
+    from docx.oxml.ns import qn
     tbl = table._tbl
     tblPr = tbl.tblPr
     borders = OxmlElement("w:tblBorders")
@@ -138,8 +164,16 @@ def set_table_borders(table, color_rgb=(0, 0, 0)):
 
     tblPr.append(borders)
 
+def _hex_color(color_rgb):
+    """(r, g, b) -> "RRGGBB"; strings are passed through unchanged."""
+    if isinstance(color_rgb, str):
+        return color_rgb
+    return "{:02X}{:02X}{:02X}".format(*color_rgb)
+
 def set_cell_border(cell, color_rgb=(0, 0, 0)):
     """Set the borders of a single cell."""
+    from docx.oxml.shared import OxmlElement
+    from docx.oxml.ns import qn
     tc = cell._tc
     tcPr = tc.get_or_add_tcPr()
     borders = OxmlElement("w:tcBorders")
@@ -148,7 +182,7 @@ def set_cell_border(cell, color_rgb=(0, 0, 0)):
         border.set(qn("w:val"), "single")
         border.set(qn("w:sz"), "12")
         border.set(qn("w:space"), "0")
-        border.set(qn("w:color"), "{:02X}{:02X}{:02X}".format(*color_rgb))
+        border.set(qn("w:color"), _hex_color(color_rgb))
         borders.append(border)
     tcPr.append(borders)
 
@@ -156,6 +190,9 @@ def _set_run_font(run, name="Century Gothic", size_pt=None, color_rgb=None):
     """
     Force a run's font (including East Asia paths) to a specific font.
     """
+    from docx.oxml.shared import OxmlElement
+    from docx.oxml.ns import qn
+    from docx.shared import RGBColor, Pt
     r = run._r
     rPr = r.get_or_add_rPr()
     rFonts = rPr.rFonts or OxmlElement('w:rFonts')
@@ -180,6 +217,8 @@ def force_document_font(doc, name="Century Gothic"):
     - All existing paragraphs/runs
     - All existing tables (headers + cells)
     """
+    from docx.oxml.shared import OxmlElement
+    from docx.oxml.ns import qn
     base = doc.styles['Normal']
     base.font.name = name
     rPr = base._element.get_or_add_rPr()
@@ -202,6 +241,7 @@ def force_document_font(doc, name="Century Gothic"):
                     for run in p.runs:
                         _set_run_font(run, name=name)
 
+@traced("normalize_columns")
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Rename known variants to canonical column names."""
     if df is None or df.empty:
@@ -209,6 +249,126 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     rename_map = {k: v for k, v in CANON_MAP.items() if k in df.columns}
     return df.rename(columns=rename_map)
 
+# ✅ Shared in-memory roster (ExcelFiles/reentry5.xlsx)
+ROSTER_PATH = "ExcelFiles/reentry5.xlsx"
+
+def normalize_name_key(name) -> str:
+    """Case-folded, whitespace-collapsed form of a youth name used as an index key."""
+    return " ".join(str(name).split()).casefold()
+
+def medical_id_key(medical_id) -> str:
+    """String form of a Medical ID used as an index key."""
+    return str(medical_id).strip()
+
+class RosterStore:
+    """
+    Keeps the normalized Excel roster in memory and re-parses the workbook
+    only when its mtime or size changes on disk.
+
+    Each load also builds hash indexes (Medical ID -> record and
+    normalized name -> records) over plain-dict records, so lookups do not
+    scan or convert the DataFrame per request.
+    """
+
+    def __init__(self, path=ROSTER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # (signature, frame, by_id, by_name) swapped as one tuple so readers
+        # never see a frame paired with another load's indexes.
+        self._state = None
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _build_indexes(frame):
+        by_id, by_name = {}, {}
+        if frame is None or frame.empty:
+            return by_id, by_name
+        for record in frame.to_dict(orient="records"):
+            mid = record.get("Medical ID Number")
+            if mid is not None and not pd.isna(mid):
+                # First row wins, as with the old `.to_dict(...)[0]` lookups
+                by_id.setdefault(medical_id_key(mid), record)
+            name = record.get("Name of the youth")
+            if name is not None and not pd.isna(name):
+                by_name.setdefault(normalize_name_key(name), []).append(record)
+        return by_id, by_name
+
+    def _load(self):
+        signature = self._file_signature()
+        state = self._state
+        if state is not None and state[0] == signature:
+            return state
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock
+            state = self._state
+            if state is None or state[0] != signature:
+                with span("excel_read"):
+                    raw = pd.read_excel(self.path)
+                frame = normalize_columns(raw)
+                state = (signature, frame) + self._build_indexes(frame)
+                self._state = state
+            return state
+
+    def get(self) -> pd.DataFrame:
+        """Return the normalized roster, reloading it if the file changed."""
+        return self._load()[1]
+
+    def find_by_id(self, medical_id) -> dict:
+        """Roster record for a Medical ID, or {} when it is not on the roster."""
+        if medical_id is None:
+            return {}
+        record = self._load()[2].get(medical_id_key(medical_id))
+        return dict(record) if record else {}
+
+    def find_by_name(self, name) -> list:
+        """All roster records whose normalized name matches `name`."""
+        if not name:
+            return []
+        return [dict(r) for r in self._load()[3].get(normalize_name_key(name), [])]
+
+    def invalidate(self):
+        """Drop the cached roster so the next access re-reads the workbook."""
+        with self._lock:
+            self._state = None
+
+roster_store = RosterStore()
+
+def get_roster() -> pd.DataFrame:
+    """Normalized roster DataFrame. Treat it as read-only; it is shared."""
+    return roster_store.get()
+
+def find_roster_record(medical_id=None, person_input=None) -> dict:
+    """
+    Roster record by Medical ID, falling back to the first record with a
+    matching name when no ID is given. Returns {} when nothing matches.
+    """
+    if medical_id:
+        return roster_store.find_by_id(medical_id)
+    matches = roster_store.find_by_name(person_input)
+    return matches[0] if matches else {}
+
+# ✅ Optional serving mode: answer lookups from the local Arrow snapshot
+# (built with `python -m src.snapshot build`) instead of the live sources.
+SERVE_FROM_SNAPSHOT = os.environ.get("SERVE_FROM_SNAPSHOT", "false").lower() in ("1", "true", "yes")
+snapshot_store = SnapshotStore(SNAPSHOT_PATH, name_key=normalize_name_key)
+
+def serving_from_snapshot() -> bool:
+    """True when snapshot serving is enabled and the snapshot file exists."""
+    return SERVE_FROM_SNAPSHOT and snapshot_store.available()
+
+def preload_roster():
+    """Parse the roster ahead of the first request (e.g. at app startup)."""
+    try:
+        roster = roster_store.get()
+        logger.info(f"✅ Roster preloaded: {len(roster)} rows from {roster_store.path}")
+        return True
+    except Exception as e:
+        logger.warning(f"Could not preload roster: {e}")
+        return False
+
 def normalize_selected_fields(selected_fields):
     """Map UI labels to canonical where needed (e.g., Medi-Cal -> Medical)."""
     normalized = []
@@ -219,10 +379,11 @@ def normalize_selected_fields(selected_fields):
         normalized.append(normalized_key)
     return normalized
 
+CASE_NOTE_KEYS = ["Case Notes", "case_notes", "casenotes"]
+
 def get_case_notes(sql_dict, bq_dict, dict_representation):
     """Fetch Case Notes with fallback SQL → BQ → Excel."""
-    possible_keys = ["Case Notes", "case_notes", "casenotes"]
-    for key in possible_keys:
+    for key in CASE_NOTE_KEYS:
         if sql_dict.get(key):
             return sql_dict[key]
         if bq_dict.get(key):
@@ -243,64 +404,567 @@ def parse_candidate_name(candidate_name):
         return name, medical_id
     return candidate_name, None
 
-def get_candidates_by_name(person_input: str):
+def _records_by_medical_id(df) -> dict:
+    """Map Medical ID -> first record of a normalized source DataFrame."""
+    records = {}
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return records
+    for row in df.to_dict(orient="records"):
+        mid = str(row.get("Medical ID Number") or "").strip()
+        if mid:
+            records.setdefault(mid, row)
+    return records
+
+def _resolve_candidates(person_name):
     """
-    Searches Excel, SQL, and BigQuery for all people with the same name.
-    Returns a de-duplicated list of (name, medical_id).
+    Name search across Excel, SQL, and BigQuery.
+    Returns (candidates, source_rows) where candidates is the de-duplicated
+    list of (name, medical_id) and source_rows maps each source to the
+    {medical_id: record} rows fetched along the way, so callers can reuse them.
     """
     candidates = []
+    source_rows = {"excel": {}, "sql": {}, "bigquery": {}}
 
-    # Strip the ID if present from the input string
-    person_name, _ = parse_candidate_name(person_input)
-    if not person_name:
-        person_name = person_input
+    if serving_from_snapshot():
+        # Snapshot records are already merged; they stand in for all sources
+        for row in snapshot_store.find_by_name(person_name):
+            mid = str(row.get("Medical ID Number") or "").strip()
+            if mid:
+                candidates.append((row.get("Name of the youth"), mid))
+                source_rows["excel"].setdefault(mid, row)
+        return candidates, source_rows
 
     # Excel
     try:
-        file_data = pd.read_excel("ExcelFiles/reentry5.xlsx")
-        file_data = normalize_columns(file_data)
-        if "Name of the youth" in file_data.columns:
-            matches = file_data[
-                file_data["Name of the youth"].astype(str).str.strip().str.lower()
-                == person_name.strip().lower()
-            ]
-            for _, row in matches.iterrows():
-                mid = str(row.get("Medical ID Number") or "").strip()
-                if mid:
-                    candidates.append((row["Name of the youth"], mid))
+        for row in roster_store.find_by_name(person_name):
+            mid = str(row.get("Medical ID Number") or "").strip()
+            if mid:
+                candidates.append((row["Name of the youth"], mid))
+                source_rows["excel"].setdefault(mid, row)
     except Exception as e:
-        print("Excel search error:", e)
+        logger.warning(f"Excel search error: {e}")
 
     # SQL
     try:
         sql_df = read_cloud_sql(person_name, medical_id=None)
         sql_df = normalize_columns(sql_df)
-        for _, row in sql_df.iterrows():
-            mid = str(row.get("Medical ID Number") or "").strip()
+        source_rows["sql"] = _records_by_medical_id(sql_df)
+        for mid, row in source_rows["sql"].items():
             name = row.get("Name of the youth")
-            if mid and name:
+            if name:
                 candidates.append((name, mid))
     except Exception as e:
-        print("SQL search error:", e)
+        logger.warning(f"SQL search error: {e}")
 
     # BigQuery
     try:
         bq_df = read_bigquery(person_name, medical_id=None)
         bq_df = normalize_columns(bq_df)
-        for _, row in bq_df.iterrows():
-            mid = str(row.get("Medical ID Number") or "").strip()
+        source_rows["bigquery"] = _records_by_medical_id(bq_df)
+        for mid, row in source_rows["bigquery"].items():
             name = row.get("Name of the youth")
-            if mid and name:
+            if name:
                 candidates.append((name, mid))
     except Exception as e:
-        print("BigQuery search error:", e)
+        logger.warning(f"BigQuery search error: {e}")
 
     unique = {}
     for name, mid in candidates:
         if mid not in unique:
             unique[mid] = name
-    return [(name, mid) for mid, name in unique.items()]
+    return [(name, mid) for mid, name in unique.items()], source_rows
+
+def get_candidates_by_name(person_input: str):
+    """
+    Searches Excel, SQL, and BigQuery for all people with the same name.
+    Returns a de-duplicated list of (name, medical_id).
+    """
+    # Strip the ID if present from the input string
+    person_name, _ = parse_candidate_name(person_input)
+    if not person_name:
+        person_name = person_input
+
+    candidates, _ = _resolve_candidates(person_name)
+    return candidates
+
+def get_candidate_profiles(person_input: str):
+    """
+    Resolves every candidate for a name and merges each one's record from
+    all sources with at most one extra query per source.
+
+    Rows already returned by the name search are reused; only Medical IDs a
+    source did not return by name are fetched, in a single batched query.
+    Returns a list of {"name", "medical_id", "record"} dicts.
+    """
+    person_name, _ = parse_candidate_name(person_input)
+    if not person_name:
+        person_name = person_input
+
+    candidates, source_rows = _resolve_candidates(person_name)
+    if not candidates:
+        return []
+    if serving_from_snapshot():
+        return [
+            {"name": name, "medical_id": mid, "record": source_rows["excel"][mid]}
+            for name, mid in candidates
+        ]
+    medical_ids = [mid for _, mid in candidates]
+
+    for mid in medical_ids:
+        if mid not in source_rows["excel"]:
+            record = roster_store.find_by_id(mid)
+            if record:
+                source_rows["excel"][mid] = record
+
+    missing_sql = [mid for mid in medical_ids if mid not in source_rows["sql"]]
+    if missing_sql:
+        try:
+            sql_df = normalize_columns(read_cloud_sql_many(missing_sql))
+            source_rows["sql"].update(_records_by_medical_id(sql_df))
+        except Exception as e:
+            logger.warning(f"SQL profile lookup error: {e}")
+
+    missing_bq = [mid for mid in medical_ids if mid not in source_rows["bigquery"]]
+    if missing_bq:
+        try:
+            bq_df = normalize_columns(read_bigquery_many(missing_bq))
+            source_rows["bigquery"].update(_records_by_medical_id(bq_df))
+        except Exception as e:
+            logger.warning(f"BigQuery profile lookup error: {e}")
+
+    profiles = []
+    for name, mid in candidates:
+        record = {
+            **source_rows["excel"].get(mid, {}),
+            **source_rows["sql"].get(mid, {}),
+            **source_rows["bigquery"].get(mid, {}),
+        }
+        profiles.append({"name": name, "medical_id": mid, "record": record})
+    return profiles
+
+
+# ✅ Concurrent source fetch (Excel, Cloud SQL, BigQuery)
+# Per-source time budgets in seconds; a source that misses its budget
+# contributes {} to the merge instead of stalling the request.
+SOURCE_TIMEOUTS = {
+    "excel": float(os.environ.get("SOURCE_TIMEOUT_EXCEL", "10")),
+    "sql": float(os.environ.get("SOURCE_TIMEOUT_SQL", "8")),
+    "bigquery": float(os.environ.get("SOURCE_TIMEOUT_BIGQUERY", "15")),
+}
+
+def _new_source_executor():
+    return ThreadPoolExecutor(
+        max_workers=int(os.environ.get("SOURCE_FETCH_WORKERS", "16")),
+        thread_name_prefix="source-fetch",
+    )
+
+_source_executor = _new_source_executor()
+
+def _first_record(df) -> dict:
+    df = normalize_columns(df)
+    return df.to_dict(orient="records")[0] if isinstance(df, pd.DataFrame) and not df.empty else {}
+
+def _fetch_excel_record(person_input, medical_id):
+    return find_roster_record(medical_id, person_input)
+
+def _fetch_sql_record(person_input, medical_id):
+    return _first_record(read_cloud_sql(person_input, medical_id))
+
+def _fetch_bigquery_record(person_input, medical_id):
+    return _first_record(read_bigquery(person_input, medical_id))
+
+# Listed in merge precedence order: later sources override earlier ones.
+SOURCE_FETCHERS = (
+    ("excel", _fetch_excel_record),
+    ("sql", _fetch_sql_record),
+    ("bigquery", _fetch_bigquery_record),
+)
+
+# ✅ Per-youth record cache (Medical ID -> per-source records, each with its own TTL).
+# The BigQuery ID lookups behind it skip bigquery_access's result cache, so a
+# cached BigQuery record is at most RECORD_CACHE_TTL_BIGQUERY seconds old.
+record_cache = RecordCache(
+    max_size=int(os.environ.get("RECORD_CACHE_MAX_SIZE", "512")),
+    ttls={
+        "excel": float(os.environ.get("RECORD_CACHE_TTL_EXCEL", "300")),
+        "sql": float(os.environ.get("RECORD_CACHE_TTL_SQL", "120")),
+        "bigquery": float(os.environ.get("RECORD_CACHE_TTL_BIGQUERY", "300")),
+    },
+)
+
+# Every worker process has its own caches, so invalidations go through a
+# shared log that each worker polls before serving lookups
+invalidation_log = InvalidationLog(
+    os.environ.get("INVALIDATION_DB_PATH", "data/invalidations.sqlite3"),
+    poll_interval=float(os.environ.get("INVALIDATION_POLL_SECONDS", "1")),
+)
+
+def _drop_cached_records(key):
+    # BigQuery keeps its own result cache underneath record_cache
+    bigquery_access.invalidate(key)
+    return record_cache.invalidate(key)
+
+def invalidate_cached_records(medical_id=None):
+    """Force the next lookup for a youth (or everyone) to hit the live sources, in every worker."""
+    key = medical_id_key(medical_id) if medical_id else None
+    try:
+        invalidation_log.publish(key)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not share cache invalidation with other workers: {e}")
+    return _drop_cached_records(key)
+
+def apply_shared_invalidations():
+    """Drop records other workers invalidated since the last check."""
+    for key in invalidation_log.poll():
+        _drop_cached_records(key)
+
+# ✅ Single-flight: concurrent identical lookups (same source and Medical ID
+# or name) share one in-flight query instead of each issuing their own
+source_flights = {name: SingleFlight(name) for name in ("records", "sql", "bigquery")}
+
+def _flight_key(person_input, medical_id):
+    return ("id", str(medical_id)) if medical_id else ("name", person_input)
+
+def singleflight_stats() -> dict:
+    return {name: flight.stats() for name, flight in source_flights.items()}
+
+def fetch_source_records(person_input, medical_id=None, use_cache=True):
+    """
+    Looks a youth up in Excel, Cloud SQL, and BigQuery in parallel.
+    Returns (records, unavailable): records maps each source name to its
+    normalized record ({} if not found), and unavailable lists the sources
+    that failed or ran past their time budget.
+
+    Lookups by Medical ID are served from record_cache while each source's
+    TTL holds; only stale sources are queried. Callers asking for the same
+    youth while a lookup is running wait for that lookup's result.
+    """
+    if serving_from_snapshot():
+        # The snapshot row is the fully merged record; pass it through the
+        # lowest-precedence slot so merge_source_records returns it unchanged.
+        if medical_id:
+            record = snapshot_store.get(medical_id)
+        else:
+            matches = snapshot_store.find_by_name(person_input)
+            record = matches[0] if matches else {}
+        return {"excel": record, "sql": {}, "bigquery": {}}, []
+
+    apply_shared_invalidations()
+    key = _flight_key(person_input, medical_id) + (use_cache,)
+    records, unavailable = source_flights["records"].do(
+        key, _fetch_live_records, person_input, medical_id, use_cache
+    )
+    # Every caller gets its own containers; the per-source records are shared
+    return dict(records), list(unavailable)
+
+def _fetch_live_records(person_input, medical_id, use_cache):
+    sources = [name for name, _ in SOURCE_FETCHERS]
+    cache_key = medical_id_key(medical_id) if (use_cache and medical_id) else None
+    if cache_key:
+        records, to_fetch = record_cache.get(cache_key, sources)
+    else:
+        records, to_fetch = {}, sources
+
+    started = time.monotonic()
+    fetchers = dict(SOURCE_FETCHERS)
+    futures = {
+        name: submit_with_context(_source_executor, fetchers[name], person_input, medical_id)
+        for name in to_fetch
+    }
+    unavailable = []
+    for name, future in futures.items():
+        remaining = SOURCE_TIMEOUTS[name] - (time.monotonic() - started)
+        try:
+            record = future.result(timeout=max(remaining, 0))
+        except FuturesTimeout:
+            future.cancel()
+            logger.warning(f"⚠️ {name} lookup exceeded {SOURCE_TIMEOUTS[name]}s; continuing without it")
+            records[name] = {}
+            unavailable.append(name)
+        except Exception as e:
+            logger.warning(f"⚠️ {name} lookup failed: {e}")
+            records[name] = {}
+            unavailable.append(name)
+        else:
+            # Only successful lookups are cached; a failure is retried next time
+            records[name] = record
+            if cache_key:
+                record_cache.put(cache_key, name, record)
+    return records, unavailable
+
+def merge_source_records(records, medical_id=None) -> dict:
+    """Merge per-source records with Excel < SQL < BigQuery precedence."""
+    merged_dict = {}
+    for name, _ in SOURCE_FETCHERS:
+        merged_dict.update(records.get(name) or {})
+    merged_dict.pop("id", None)
+
+    # FIX: Explicitly add the medical ID back into the dictionary
+    if medical_id:
+        merged_dict["Medical ID Number"] = medical_id
+    return merged_dict
+
+def fetch_source_records_many(medical_ids):
+    """
+    Bulk version of fetch_source_records for a list of Medical IDs: cached
+    records are reused and everything else is fetched with one query per
+    source (run concurrently). Returns (records_by_id, unavailable) where
+    records_by_id maps each Medical ID to its per-source records.
+    """
+    medical_ids = list(dict.fromkeys(medical_id_key(mid) for mid in medical_ids if mid))
+    sources = [name for name, _ in SOURCE_FETCHERS]
+
+    if serving_from_snapshot():
+        return {
+            mid: {"excel": snapshot_store.get(mid), "sql": {}, "bigquery": {}}
+            for mid in medical_ids
+        }, []
+
+    apply_shared_invalidations()
+    records_by_id, stale = {}, {name: [] for name in sources}
+    for mid in medical_ids:
+        records_by_id[mid], to_fetch = record_cache.get(mid, sources)
+        for name in to_fetch:
+            stale[name].append(mid)
+
+    def fetch_excel(ids):
+        return {mid: roster_store.find_by_id(mid) for mid in ids}
+
+    def fetch_sql(ids):
+        return _records_by_medical_id(normalize_columns(read_cloud_sql_many(ids)))
+
+    def fetch_bigquery(ids):
+        return _records_by_medical_id(normalize_columns(read_bigquery_many(ids)))
+
+    bulk_fetchers = {"excel": fetch_excel, "sql": fetch_sql, "bigquery": fetch_bigquery}
+    started = time.monotonic()
+    futures = {
+        name: submit_with_context(_source_executor, bulk_fetchers[name], ids)
+        for name, ids in stale.items() if ids
+    }
+    unavailable = []
+    for name, future in futures.items():
+        # One query covers many IDs, so allow twice the single-lookup budget
+        remaining = 2 * SOURCE_TIMEOUTS[name] - (time.monotonic() - started)
+        try:
+            rows = future.result(timeout=max(remaining, 0))
+        except FuturesTimeout:
+            future.cancel()
+            logger.warning(f"⚠️ bulk {name} lookup timed out; continuing without it")
+            rows = None
+        except Exception as e:
+            logger.warning(f"⚠️ bulk {name} lookup failed: {e}")
+            rows = None
+        if rows is None:
+            unavailable.append(name)
+        for mid in stale[name]:
+            record = (rows or {}).get(mid, {})
+            records_by_id[mid][name] = record
+            if rows is not None:
+                record_cache.put(mid, name, record)
+    return records_by_id, unavailable
+
+
+# ✅ Report rendering from pre-built template skeletons
+report_template = DocxTemplate(TEMPLATE_PATH)
+
+REPORT_TITLES = {
+    "reentry_care_plan": "{name}'s Reentry Care Plan",
+    "data_validation_report": "Data Validation Report for {name}",
+}
+
+def _build_report_skeleton(doc, value_header):
+    """
+    Add the static part of a report to a parsed template: the title paragraph
+    (text filled in per request), a spacer, and the Field/value table with one
+    labeled row per DISPLAY_ORDER_REENTRY entry. Returns the layout indexes.
+    """
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+    title_index = len(doc.paragraphs)
+    title_paragraph = doc.add_paragraph("Title")
+    title_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    title_run = title_paragraph.runs[0]
+    title_run.bold = True
+    _set_run_font(title_run, name="Century Gothic", size_pt=16, color_rgb=(0, 0, 0))
+
+    doc.add_paragraph("")
+
+    table_index = len(doc.tables)
+    table = doc.add_table(rows=1, cols=2)
+    try:
+        table.style = "Table Grid"
+    except KeyError:
+        set_table_borders(table)
 
+    hdr_cells = table.rows[0].cells
+    hdr_cells[0].text = "Field"
+    hdr_cells[1].text = value_header
+
+    for canonical_key in DISPLAY_ORDER_REENTRY:
+        row_cells = table.add_row().cells
+        row_cells[0].text = str(canonical_key)
+
+    return {"title": title_index, "table": table_index}
+
+def _build_reentry_skeleton(doc):
+    return _build_report_skeleton(doc, "Value")
+
+def _build_validation_skeleton(doc):
+    return _build_report_skeleton(doc, "Status")
+
+REPORT_SKELETONS = {
+    "reentry_care_plan": _build_reentry_skeleton,
+    "data_validation_report": _build_validation_skeleton,
+}
+
+def _clone_report(kind, person_input):
+    """Fresh copy of a report skeleton with its title filled in: (doc, value_rows)."""
+    doc, layout = report_template.clone(kind, REPORT_SKELETONS[kind])
+    doc.paragraphs[layout["title"]].runs[0].text = REPORT_TITLES[kind].format(name=person_input)
+    value_rows = doc.tables[layout["table"]].rows[1:]
+    return doc, value_rows
+
+def _save_document(doc):
+    doc_io = BytesIO()
+    with span("document_save"):
+        doc.save(doc_io)
+    doc_io.seek(0)
+    return doc_io
+
+def reentry_value_text(merged_dict, canonical_key, selected_canonical_keys):
+    """Text shown in the Value column of a care plan for one field."""
+    if canonical_key not in selected_canonical_keys:
+        return "Not Selected"
+    value = merged_dict.get(canonical_key, "Data Not Available")
+    if pd.isna(value) or str(value).strip() == "" or str(value).lower() == "nan":
+        return "Data Not Available"
+    return str(value)
+
+def is_field_missing(merged_dict, canonical_key, notes_value=None):
+    """Whether the validation report flags a field as Data Not Available."""
+    if canonical_key == "Case Notes":
+        return pd.isna(notes_value) or str(notes_value).strip() == "" or str(notes_value).lower() in ["nan", "none", "no case notes available."]
+    value = merged_dict.get(canonical_key)
+    return pd.isna(value) or (isinstance(value, str) and value.strip() == "") or value is None
+
+# Rendering backend: "python-docx" (default) or "ooxml", which writes
+# word/document.xml from pre-serialized fragments (see src/ooxml_writer.py).
+DOCX_BACKEND = os.environ.get("DOCX_BACKEND", "python-docx")
+ooxml_writer = OoxmlReportWriter(report_template)
+
+VALIDATION_COLORS = {True: (255, 0, 0), False: (0, 128, 0)}
+
+def _mark_report_slots(doc, layout, borders=False):
+    """Put OOXML writer slot markers where the per-request values go."""
+    doc.paragraphs[layout["title"]].runs[0].text = TITLE_SLOT
+    for index, row in enumerate(doc.tables[layout["table"]].rows[1:]):
+        cell = row.cells[1]
+        cell.text = value_slot(index)
+        if borders:
+            set_cell_border(cell, color_rgb=border_slot(index))
+
+def _mark_reentry_slots(doc, layout):
+    _mark_report_slots(doc, layout)
+
+def _mark_validation_slots(doc, layout):
+    _mark_report_slots(doc, layout, borders=True)
+
+def _use_ooxml(backend):
+    return (backend or DOCX_BACKEND) == "ooxml"
+
+# ✅ Rendered document cache. A report is a pure function of its title, the
+# per-row cell values (derived from the merged record and the canonical
+# selected fields), the template version, the backend and the rendering code,
+# so those are hashed into the key; set RENDER_CACHE_MAX_BYTES=0 to disable.
+# Bump RENDER_VERSION whenever report layout or rendering changes: cached
+# documents from other versions (including the disk tier) are then discarded.
+RENDER_VERSION = "2"
+RENDER_CACHE_MAX_BYTES = int(os.environ.get("RENDER_CACHE_MAX_BYTES", str(64 * 2**20)))
+render_cache = DocumentCache(
+    max_memory_bytes=RENDER_CACHE_MAX_BYTES,
+    disk_dir=os.environ.get("RENDER_CACHE_DIR", "data/render_cache") if RENDER_CACHE_MAX_BYTES else None,
+    max_disk_bytes=int(os.environ.get("RENDER_CACHE_DISK_MAX_BYTES", str(512 * 2**20))),
+    version=RENDER_VERSION,
+)
+
+def _render_cached(report_type, backend, title, cells, render):
+    """Return a BytesIO of the cached document for these inputs, rendering it on a miss."""
+    if not RENDER_CACHE_MAX_BYTES:
+        with span("document_build"):
+            return render()
+    key = document_key(RENDER_VERSION, report_type, backend or DOCX_BACKEND, report_template.version(), title, cells)
+    data = render_cache.get(key)
+    if data is None:
+        with span("document_build"):
+            data = render().getvalue()
+        render_cache.put(key, data)
+    return BytesIO(data)
+
+def render_reentry_care_plan(person_input, merged_dict, selected_fields, backend=None):
+    """Render a care plan for an already merged record; returns a BytesIO .docx."""
+    selected_canonical_keys = set(normalize_selected_fields(selected_fields))
+    texts = [
+        reentry_value_text(merged_dict, canonical_key, selected_canonical_keys)
+        for canonical_key in DISPLAY_ORDER_REENTRY
+    ]
+
+    title = REPORT_TITLES["reentry_care_plan"].format(name=person_input)
+
+    def render():
+        if _use_ooxml(backend):
+            compiled = ooxml_writer.compiled("reentry_care_plan", _build_reentry_skeleton, _mark_reentry_slots)
+            values = {"TITLE": title}
+            values.update((f"VALUE_{i}", text) for i, text in enumerate(texts))
+            with span("document_write"):
+                return compiled.write(values)
+
+        doc, value_rows = _clone_report("reentry_care_plan", person_input)
+        for row, text in zip(value_rows, texts):
+            row.cells[1].text = text
+        return _save_document(doc)
+
+    return _render_cached("reentry_care_plan", backend, title, texts, render)
+
+def render_data_validation_report(person_input, merged_dict, notes_value, backend=None):
+    """Render a validation report for an already merged record; returns a BytesIO .docx."""
+    missing = [
+        is_field_missing(merged_dict, canonical_key, notes_value)
+        for canonical_key in DISPLAY_ORDER_REENTRY
+    ]
+
+    title = REPORT_TITLES["data_validation_report"].format(name=person_input)
+
+    def render():
+        if _use_ooxml(backend):
+            compiled = ooxml_writer.compiled("data_validation_report", _build_validation_skeleton, _mark_validation_slots)
+            values = {"TITLE": title}
+            for i, is_missing in enumerate(missing):
+                values[f"VALUE_{i}"] = "Data Not Available" if is_missing else "Data Available"
+                values[f"BORDER_{i}"] = _hex_color(VALIDATION_COLORS[is_missing])
+            with span("document_write"):
+                return compiled.write(values)
+
+        doc, value_rows = _clone_report("data_validation_report", person_input)
+        for row, is_missing in zip(value_rows, missing):
+            cell = row.cells[1]
+            cell.text = "Data Not Available" if is_missing else "Data Available"
+            set_cell_border(cell, color_rgb=VALIDATION_COLORS[is_missing])
+        return _save_document(doc)
+
+    return _render_cached("data_validation_report", backend, title, missing, render)
+
+def render_report_bytes(report_type, person_input, merged_dict, selected_fields=None, notes_value=None):
+    """
+    Render one report to bytes. Top-level and pickle-friendly so batches can
+    run it on a process pool; each worker process builds its own skeletons.
+    """
+    if report_type == "data_validation_report":
+        doc_io = render_data_validation_report(person_input, merged_dict, notes_value)
+    else:
+        normalized_merged_dict = {k.strip(): v for k, v in merged_dict.items()}
+        doc_io = render_reentry_care_plan(person_input, normalized_merged_dict, selected_fields or [])
+    return doc_io.getvalue()
 
 def generate_reentry_care_plan(selected_fields, candidate_name, app_option):
     """
@@ -314,86 +978,20 @@ def generate_reentry_care_plan(selected_fields, candidate_name, app_option):
             person_input = candidate_name.split('(')[0].strip()
             medical_id = None
         
-        file_data = pd.read_excel("ExcelFiles/reentry5.xlsx")
-        file_data = normalize_columns(file_data)
-        if medical_id and "Medical ID Number" in file_data.columns:
-            person_row = file_data[file_data["Medical ID Number"].astype(str) == str(medical_id)]
-        else:
-            person_row = file_data[file_data.get("Name of the youth", pd.Series(dtype=str)) == person_input]
-        dict_representation = person_row.to_dict(orient="records")[0] if not person_row.empty else {}
-
-        sql_record = read_cloud_sql(person_input, medical_id)
-        sql_record = normalize_columns(sql_record)
-        sql_dict = (sql_record.to_dict(orient="records")[0]
-                    if isinstance(sql_record, pd.DataFrame) and not sql_record.empty else {})
-
-        bq_record = read_bigquery(person_input, medical_id)
-        bq_record = normalize_columns(bq_record)
-        bq_dict = (bq_record.to_dict(orient="records")[0]
-                    if isinstance(bq_record, pd.DataFrame) and not bq_record.empty else {})
-
-        merged_dict = {}
-        merged_dict.update(dict_representation)
-        merged_dict.update(sql_dict)
-        merged_dict.update(bq_dict)
-        merged_dict.pop("id", None)
-        
-        # FIX: Explicitly add the medical ID back into the dictionary
-        if medical_id:
-            merged_dict["Medical ID Number"] = medical_id
-        
-        normalized_merged_dict = {k.strip(): v for k, v in merged_dict.items()}
-
-        print("\n✅ FINAL MERGED DATA:", normalized_merged_dict)
-
-        template_path = "data/Template.docx"
-        if not os.path.exists(template_path):
-            raise FileNotFoundError(f"Template file not found at: {template_path}")
-        
-        doc = Document(template_path)
-        
-        # Add the main title for the table section
-        title_paragraph = doc.add_paragraph(f"{person_input}'s Reentry Care Plan")
-        title_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        title_run = title_paragraph.runs[0]
-        title_run.bold = True
-        _set_run_font(title_run, name="Century Gothic", size_pt=16, color_rgb=(0, 0, 0))
+        records, unavailable = fetch_source_records(person_input, medical_id)
+        if unavailable:
+            logger.warning(f"⚠️ Care plan built without: {', '.join(unavailable)}")
+        merged_dict = merge_source_records(records, medical_id)
 
-        doc.add_paragraph("")
+        normalized_merged_dict = {k.strip(): v for k, v in merged_dict.items()}
 
-        table = doc.add_table(rows=1, cols=2)
-        
-        try:
-            table.style = "Table Grid"
-        except KeyError:
-            set_table_borders(table)
+        # Merged records carry case notes and other PHI: log field presence only
+        logger.debug("✅ Final merged data", extra={'merged': redact_record(normalized_merged_dict)})
 
-        hdr_cells = table.rows[0].cells
-        hdr_cells[0].text = "Field"
-        hdr_cells[1].text = "Value"
-        
-        selected_canonical_keys = normalize_selected_fields(selected_fields)
-
-        for canonical_key in DISPLAY_ORDER_REENTRY:
-            row_cells = table.add_row().cells
-            row_cells[0].text = str(canonical_key)
-            
-            value = normalized_merged_dict.get(canonical_key, "Data Not Available")
-
-            if canonical_key in selected_canonical_keys:
-                row_cells[1].text = "" if pd.isna(value) else str(value)
-                if pd.isna(value) or str(value).strip() == "" or str(value).lower() == "nan":
-                    row_cells[1].text = "Data Not Available"
-            else:
-                row_cells[1].text = "Not Selected"
-
-        doc_io = BytesIO()
-        doc.save(doc_io)
-        doc_io.seek(0)
-        return doc_io
+        return render_reentry_care_plan(person_input, normalized_merged_dict, selected_fields)
 
     except Exception as e:
-        print("❌ Error in generate_reentry_care_plan:", str(e))
+        logger.exception("❌ Error in generate_reentry_care_plan")
         return None
 
 def generate_data_validation_report(selected_fields, candidate_name, app_option):
@@ -403,160 +1001,357 @@ def generate_data_validation_report(selected_fields, candidate_name, app_option)
     """
     try:
         person_input, medical_id = parse_candidate_name(candidate_name)
-        file_data = pd.read_excel("ExcelFiles/reentry5.xlsx")
-        file_data = normalize_columns(file_data)
+        records, unavailable = fetch_source_records(person_input, medical_id)
+        if unavailable:
+            logger.warning(f"⚠️ Validation report built without: {', '.join(unavailable)}")
+        merged_dict = merge_source_records(records, medical_id)
+        notes_value = get_case_notes(records["sql"], records["bigquery"], records["excel"])
 
-        if medical_id and "Medical ID Number" in file_data.columns:
-            person_row = file_data[file_data["Medical ID Number"].astype(str) == str(medical_id)]
-        else:
-            person_row = file_data[file_data.get("Name of the youth", pd.Series(dtype=str)) == person_input]
-        dict_representation = person_row.to_dict(orient="records")[0] if not person_row.empty else {}
+        return render_data_validation_report(person_input, merged_dict, notes_value)
 
-        sql_record = read_cloud_sql(person_input, medical_id)
-        sql_record = normalize_columns(sql_record)
+    except Exception as e:
+        logger.exception("❌ Error in generate_data_validation_report")
+        try:
+            import streamlit as st
+            st.error(f"Failed to generate data validation report: {e}")
+        except ImportError:
+            pass
+        return None
 
-        bq_record = read_bigquery(person_input, medical_id)
-        bq_record = normalize_columns(bq_record)
+# ✅ Process-wide Cloud SQL engine (created lazily, shared by all threads)
+SQL_POOL_SIZE = int(os.environ.get("CLOUD_SQL_POOL_SIZE", "5"))
+SQL_MAX_OVERFLOW = int(os.environ.get("CLOUD_SQL_MAX_OVERFLOW", "10"))
+SQL_POOL_TIMEOUT = float(os.environ.get("CLOUD_SQL_POOL_TIMEOUT", "30"))
+SQL_POOL_RECYCLE = int(os.environ.get("CLOUD_SQL_POOL_RECYCLE", "1800"))
+SQL_POOL_PRE_PING = os.environ.get("CLOUD_SQL_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
 
-        sql_dict = (sql_record.to_dict(orient="records")[0]
-                    if isinstance(sql_record, pd.DataFrame) and not sql_record.empty else {})
-        bq_dict = (bq_record.to_dict(orient="records")[0]
-                    if isinstance(bq_record, pd.DataFrame) and not bq_record.empty else {})
+_sql_engine = None
+_sql_engine_lock = threading.Lock()
+_sql_pool_wait = {"checkouts": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
 
-        merged_dict = {}
-        merged_dict.update(dict_representation)
-        merged_dict.update(sql_dict)
-        merged_dict.update(bq_dict)
-        merged_dict.pop("id", None)
+def _get_sql_engine():
+    """Shared SQLAlchemy engine for the Cloud SQL database, or None if not configured."""
+    global _sql_engine
+    if _sql_engine is not None:
+        return _sql_engine
 
-        # FIX: Explicitly add the medical ID back into the dictionary
-        if medical_id:
-            merged_dict["Medical ID Number"] = medical_id
+    user = os.environ.get("CLOUD_SQL_USER")
+    password = os.environ.get("CLOUD_SQL_PASSWORD")
+    host = os.environ.get("CLOUD_SQL_HOST")
+    database = "serrano"
 
-        # Load the existing template document
-        template_path = "data/Template.docx"
-        if not os.path.exists(template_path):
-            raise FileNotFoundError(f"Template file not found at: {template_path}")
-        doc = Document(template_path)
+    if not all([user, password, host]):
+        logger.warning("SQL connection details missing from environment variables.")
+        return None
 
-        # Add the report title
-        title_paragraph = doc.add_paragraph(f"Data Validation Report for {person_input}")
-        title_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        title_run = title_paragraph.runs[0]
-        title_run.bold = True
-        _set_run_font(title_run, name="Century Gothic", size_pt=16, color_rgb=(0, 0, 0))
+    with _sql_engine_lock:
+        if _sql_engine is None:
+            connection_url = f"mysql+pymysql://{user}:{password}@{host}/{database}"
+            _sql_engine = create_engine(
+                connection_url,
+                pool_size=SQL_POOL_SIZE,
+                max_overflow=SQL_MAX_OVERFLOW,
+                pool_timeout=SQL_POOL_TIMEOUT,
+                pool_recycle=SQL_POOL_RECYCLE,
+                pool_pre_ping=SQL_POOL_PRE_PING,
+            )
+    return _sql_engine
 
-        doc.add_paragraph("")
+def set_sql_engine(engine):
+    """
+    Use `engine` for all Cloud SQL reads instead of the configured MySQL
+    instance (e.g. a SQLite stand-in for benchmarks). Statements are rebuilt
+    against the new engine's table.
+    """
+    global _sql_engine, _sql_statements
+    with _sql_engine_lock:
+        _sql_engine = engine
+    with _sql_statements_lock:
+        _sql_statements = None
 
-        # Create a table with 'Field' and 'Status' headers
-        table = doc.add_table(rows=1, cols=2)
-        try:
-            table.style = "Table Grid"
-        except KeyError:
-            set_table_borders(table)
+@contextmanager
+def _sql_connection(engine):
+    """Check a connection out of the pool, recording how long the checkout waited."""
+    started = time.perf_counter()
+    conn = engine.connect()
+    waited = time.perf_counter() - started
+    with _sql_engine_lock:
+        _sql_pool_wait["checkouts"] += 1
+        _sql_pool_wait["wait_seconds_total"] += waited
+        _sql_pool_wait["wait_seconds_max"] = max(_sql_pool_wait["wait_seconds_max"], waited)
+    try:
+        yield conn
+    finally:
+        conn.close()
 
-        hdr_cells = table.rows[0].cells
-        hdr_cells[0].text = "Field"
-        hdr_cells[1].text = "Status"
-        
-        all_canonical_fields = list(dict.fromkeys(CANON_MAP.values()).keys())
-        
-        for canonical_key in DISPLAY_ORDER_REENTRY:
-            row_cells = table.add_row().cells
-            
-            ui_label = canonical_key
-            row_cells[0].text = str(ui_label)
-
-            value = merged_dict.get(canonical_key)
-            
-            is_missing = pd.isna(value) or (isinstance(value, str) and value.strip() == "") or value is None
-
-            if canonical_key == "Case Notes":
-                notes_value = get_case_notes(sql_dict, bq_dict, dict_representation)
-                is_missing = pd.isna(notes_value) or str(notes_value).strip() == "" or str(notes_value).lower() in ["nan", "none", "no case notes available."]
-            
-            if is_missing:
-                row_cells[1].text = "Data Not Available"
-                set_cell_border(row_cells[1], color_rgb=(255, 0, 0))
-            else:
-                row_cells[1].text = "Data Available"
-                set_cell_border(row_cells[1], color_rgb=(0, 128, 0))
-        
-        doc_io = BytesIO()
-        doc.save(doc_io)
-        doc_io.seek(0)
-        return doc_io
+def get_sql_pool_stats() -> dict:
+    """Connection pool statistics for the shared Cloud SQL engine."""
+    with _sql_engine_lock:
+        wait = dict(_sql_pool_wait)
+    checkouts = wait["checkouts"]
+    stats = {
+        "engine_created": _sql_engine is not None,
+        "pool_size": SQL_POOL_SIZE,
+        "max_overflow": SQL_MAX_OVERFLOW,
+        "checkouts": checkouts,
+        "wait_seconds_total": round(wait["wait_seconds_total"], 6),
+        "wait_seconds_max": round(wait["wait_seconds_max"], 6),
+        "wait_seconds_avg": round(wait["wait_seconds_total"] / checkouts, 6) if checkouts else 0.0,
+    }
+    if _sql_engine is not None:
+        pool = _sql_engine.pool
+        stats.update({
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        })
+    return stats
 
-    except Exception as e:
-        print("❌ Error in generate_data_validation_report:", traceback.format_exc())
-        st.error(f"Failed to generate data validation report: {e}")
-        return None
+# ✅ Cloud SQL statements: bound parameters and an explicit column list
+SQL_TABLE = "SocialEconomicLogistics_backup"
+
+# Only columns that map onto a document field are transferred; wide columns
+# the reports never show stay on the server.
+SQL_WANTED_COLUMNS = tuple(dict.fromkeys(
+    key for key, canonical in CANON_MAP.items() if canonical in DISPLAY_ORDER_REENTRY
+))
+
+_sql_statements = None
+_sql_statements_lock = threading.Lock()
 
+def _build_sql_statements(columns):
+    select_list = ", ".join(f"`{c}`" for c in columns) if columns else "*"
+    base = f"SELECT {select_list} FROM {SQL_TABLE}"
+    return {
+        "by_id": text(f"{base} WHERE medical_id_number = :medical_id"),
+        "by_name": text(f"{base} WHERE youth_name = :name"),
+        "by_ids": text(f"{base} WHERE medical_id_number IN :ids").bindparams(
+            bindparam("ids", expanding=True)
+        ),
+        "all": text(base),
+        "names": text(f"SELECT youth_name, medical_id_number FROM {SQL_TABLE}"),
+    }
+
+def _get_sql_statements(engine):
+    """
+    Statements for the Cloud SQL lookups, built once per process.
+    The wanted columns are intersected with the table's real columns on first
+    use so a field missing from the table cannot break every query.
+    """
+    global _sql_statements
+    if _sql_statements is not None:
+        return _sql_statements
+    with _sql_statements_lock:
+        if _sql_statements is None:
+            try:
+                available = {c["name"] for c in sql_inspect(engine).get_columns(SQL_TABLE)}
+            except Exception as e:
+                # Don't cache: retry reflection on the next call
+                logger.warning(f"Could not reflect {SQL_TABLE} columns, selecting all: {e}")
+                return _build_sql_statements(None)
+            _sql_statements = _build_sql_statements(
+                [c for c in SQL_WANTED_COLUMNS if c in available]
+            )
+    return _sql_statements
+
+@traced("sql")
 def read_cloud_sql(person_input, medical_id=None):
-    user = os.environ.get("CLOUD_SQL_USER")
-    password = os.environ.get("CLOUD_SQL_PASSWORD")
-    host = os.environ.get("CLOUD_SQL_HOST")
-    database = "serrano"
+    key = _flight_key(person_input, medical_id)
+    return source_flights["sql"].do(key, _read_cloud_sql, person_input, medical_id)
 
-    if not all([user, password, host]):
-        print("SQL connection details missing from environment variables.")
+def _read_cloud_sql(person_input, medical_id):
+    engine = _get_sql_engine()
+    if engine is None:
         return pd.DataFrame()
 
-    connection_url = f"mysql+pymysql://{user}:{password}@{host}/{database}"
-    engine = create_engine(connection_url)
+    statements = _get_sql_statements(engine)
     if medical_id:
-        query = f"SELECT * FROM SocialEconomicLogistics_backup WHERE medical_id_number='{medical_id}'"
+        query, params = statements["by_id"], {"medical_id": str(medical_id)}
     else:
-        query = f"SELECT * FROM SocialEconomicLogistics_backup WHERE youth_name='{person_input}'"
+        query, params = statements["by_name"], {"name": person_input}
+    # Errors propagate: an empty frame would read as "youth not in SQL" and
+    # get cached, while the caller should report SQL as unavailable instead
+    with _sql_connection(engine) as conn:
+        return pd.read_sql(query, conn, params=params)
+
+@traced("sql")
+def read_cloud_sql_many(medical_ids):
+    """Fetch the Cloud SQL rows for several Medical IDs in one query. Raises on query errors."""
+    medical_ids = [str(mid) for mid in medical_ids if mid]
+    if not medical_ids:
+        return pd.DataFrame()
+    engine = _get_sql_engine()
+    if engine is None:
+        return pd.DataFrame()
+
+    query = _get_sql_statements(engine)["by_ids"]
+    with _sql_connection(engine) as conn:
+        return pd.read_sql(query, conn, params={"ids": medical_ids})
+
+@traced("sql")
+def read_cloud_sql_all():
+    """
+    Fetch every Cloud SQL row (wanted columns only), e.g. for snapshots.
+    Raises on query errors, so an outage is not mistaken for an empty table.
+    """
+    engine = _get_sql_engine()
+    if engine is None:
+        return pd.DataFrame()
+    with _sql_connection(engine) as conn:
+        return pd.read_sql(_get_sql_statements(engine)["all"], conn)
+
+@traced("sql")
+def read_cloud_sql_names():
+    """youth_name and medical_id_number for every Cloud SQL row, e.g. for the search index."""
+    engine = _get_sql_engine()
+    if engine is None:
+        return pd.DataFrame()
     try:
-        df = pd.read_sql(query, engine)
-        return df
+        with _sql_connection(engine) as conn:
+            return pd.read_sql(_get_sql_statements(engine)["names"], conn)
     except Exception as e:
-        print(f"Error reading from Cloud SQL: {e}")
+        logger.error(f"Error reading from Cloud SQL: {e}")
         return pd.DataFrame()
 
+# ✅ BigQuery access layer (result cache, optional Parquet snapshot, query metrics).
+# BQ_CACHE_TTL covers name lookups; ID lookups rely on record_cache instead.
+bigquery_access = BigQueryAccess(
+    get_bigquery_client,
+    cache_ttl=float(os.environ.get("BQ_CACHE_TTL", "300")),
+    cache_max_size=int(os.environ.get("BQ_CACHE_MAX_SIZE", "1024")),
+    snapshot_path=os.environ.get("BQ_SNAPSHOT_PATH") or None,
+)
+
+@traced("bigquery")
 def read_bigquery(person_input, medical_id=None):
-    if not client:
-        return pd.DataFrame()
+    key = _flight_key(person_input, medical_id)
+    return source_flights["bigquery"].do(key, _read_bigquery, person_input, medical_id)
 
+def _read_bigquery(person_input, medical_id):
+    # Errors propagate, as in _read_cloud_sql. ID lookups feed record_cache,
+    # which has its own BigQuery TTL; also caching the query result would let
+    # a row be up to both TTLs old.
     if medical_id:
-        query = """
-            SELECT *
-            FROM `genai-poc-424806.SerranoAdvisorsBQ.scalablefeaturesforBQ`
-            WHERE medical_id_number = @mid
-        """
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[bigquery.ScalarQueryParameter("mid", "STRING", str(medical_id))]
-        )
-    else:
-        query = """
-            SELECT *
-            FROM `genai-poc-424806.SerranoAdvisorsBQ.scalablefeaturesforBQ`
-            WHERE youth_name = @name
-        """
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[bigquery.ScalarQueryParameter("name", "STRING", person_input)]
-        )
+        return bigquery_access.lookup_by_id(medical_id, use_cache=False)
+    return bigquery_access.lookup_by_name(person_input)
+
+@traced("bigquery")
+def read_bigquery_many(medical_ids):
+    """Fetch the BigQuery rows for several Medical IDs in one query job. Raises on query errors."""
+    return bigquery_access.lookup_by_ids(medical_ids, use_cache=False)
+
+@traced("bigquery")
+def read_bigquery_names():
+    """youth_name and medical_id_number for every BigQuery row, e.g. for the search index."""
     try:
-        df = client.query(query, job_config=job_config).to_dataframe()
-        return df
+        return bigquery_access.lookup_names()
     except Exception as e:
-        print(f"Error reading from BigQuery: {e}")
+        logger.error(f"Error reading from BigQuery: {e}")
         return pd.DataFrame()
 
-DB_CONFIG = {
-    "host": os.environ.get("CLOUD_SQL_HOST", "34.44.69.178"),
-    "user": os.environ.get("CLOUD_SQL_USER", "root"),
-    "password": os.environ.get("CLOUD_SQL_PASSWORD", "SQLsql$123"),
-    "database": "serrano",
-}
-try:
-    conn = pymysql.connect(**DB_CONFIG)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM SocialEconomicLogistics_backup LIMIT 3")
-    rows = cursor.fetchall()
-    print("✅ rows:", rows)
-    cursor.close()
-    conn.close()
-except Exception as e:
-    print("DB smoke test failed:", e)
\ No newline at end of file
+@traced("bigquery")
+def read_bigquery_all():
+    """Fetch the whole BigQuery table, e.g. for snapshots. Raises on query errors."""
+    return bigquery_access.lookup_all()
+
+# ✅ Typeahead index over every youth name in the three sources
+def load_search_entries():
+    """(name, Medical ID) pairs from the roster, Cloud SQL and BigQuery."""
+    entries = []
+    sources = (
+        ("Excel", roster_store.get),
+        ("SQL", lambda: normalize_columns(read_cloud_sql_names())),
+        ("BigQuery", lambda: normalize_columns(read_bigquery_names())),
+    )
+    for label, load in sources:
+        try:
+            df = load()
+            if isinstance(df, pd.DataFrame) and "Name of the youth" in df.columns:
+                ids = df["Medical ID Number"] if "Medical ID Number" in df.columns else [None] * len(df)
+                entries.extend(zip(df["Name of the youth"], ids))
+        except Exception as e:
+            logger.warning(f"{label} search index load error: {e}")
+    return entries
+
+# Set SEARCH_INDEX_PATH (e.g. to a file in a private directory) to have the
+# worker processes share one index build; the file holds every youth's name
+# and Medical ID, so it is off by default and each process loads the sources
+search_index = SearchIndexService(
+    load_search_entries,
+    refresh_interval=float(os.environ.get("SEARCH_INDEX_REFRESH_SECONDS", "300")),
+    shared_path=os.environ.get("SEARCH_INDEX_PATH") or None,
+)
+
+# ✅ Warm-up and readiness (replaces the old import-time DB smoke test)
+def preload_shared():
+    """
+    Parse the roster and build the report skeletons. Opens no connections or
+    threads, so a preforking server can run it once in the master and let
+    every worker share the result copy-on-write.
+    """
+    preload_roster()
+    try:
+        report_template.preload(REPORT_SKELETONS)
+    except Exception as e:
+        logger.warning(f"Could not preload report template: {e}")
+
+def reset_after_fork():
+    """
+    Drop state a forked worker must not share with its parent: pooled SQL
+    connections, the BigQuery client and the source-fetch threads. Each
+    worker then opens its own on first use.
+    """
+    global _bq_client, _bq_client_failed, _source_executor
+    with _sql_engine_lock:
+        if _sql_engine is not None:
+            _sql_engine.dispose(close=False)
+    with _bq_client_lock:
+        _bq_client, _bq_client_failed = None, False
+    _source_executor = _new_source_executor()
+
+def warm_up():
+    """
+    Pay cold-start costs before serving traffic: parse the roster, build the
+    report skeletons, create the BigQuery client, start building the search
+    index and open a pooled SQL connection.
+    Returns the readiness report.
+    """
+    preload_shared()
+    get_bigquery_client()
+    search_index.start()
+    return check_readiness()
+
+def check_readiness():
+    """
+    Check each dependency without running billed queries.
+    Returns (ready, checks) where checks maps dependency -> {"ok", "detail"}.
+    """
+    checks = {}
+
+    try:
+        checks["roster"] = {"ok": True, "detail": f"{len(get_roster())} rows"}
+    except Exception as e:
+        checks["roster"] = {"ok": False, "detail": str(e)}
+
+    engine = _get_sql_engine()
+    if engine is None:
+        checks["cloud_sql"] = {"ok": False, "detail": "connection details missing"}
+    else:
+        try:
+            with _sql_connection(engine) as conn:
+                conn.execute(text("SELECT 1"))
+            checks["cloud_sql"] = {"ok": True, "detail": "SELECT 1 succeeded"}
+        except Exception as e:
+            checks["cloud_sql"] = {"ok": False, "detail": str(e)}
+
+    if get_bigquery_client() is not None:
+        checks["bigquery"] = {"ok": True, "detail": "client initialized"}
+    else:
+        checks["bigquery"] = {"ok": False, "detail": "client unavailable"}
+
+    if serving_from_snapshot():
+        # Live sources are optional while lookups come from the snapshot
+        ready = True
+    else:
+        ready = all(check["ok"] for check in checks.values())
+    return ready, checks
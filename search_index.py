@@ -0,0 +1,238 @@
+import bisect
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+
+from src.hra_output import file_lock
+
+logger = logging.getLogger(__name__)
+
+# Fuzzy (trigram-only) matches below this similarity are not returned
+MIN_SIMILARITY = 0.3
+# Ranking bonus for a query that is a prefix of the whole name / of one word
+NAME_PREFIX_BONUS = 1.0
+WORD_PREFIX_BONUS = 0.5
+
+
+def normalize(name):
+    return " ".join(str(name).split()).casefold()
+
+
+def trigrams(text):
+    """Character trigrams of a normalized name, padded so short names and word starts count."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Immutable in-memory index of youth names for typeahead search.
+
+    Supports two kinds of match:
+    - Prefix matches on the whole name or on any word in it, found by
+      bisecting sorted keys.
+    - Fuzzy matches, through an inverted trigram index.
+
+    Results are ranked by trigram similarity plus a prefix bonus. Each entry
+    keeps the set of Medical IDs seen under that name, so the UI can show how
+    many youths share it.
+    """
+
+    def __init__(self, entries):
+        ids_by_key = {}
+        display = {}
+        for name, medical_id in entries:
+            if name is None or str(name).strip() in ("", "nan"):
+                continue
+            key = normalize(name)
+            display.setdefault(key, " ".join(str(name).split()))
+            ids = ids_by_key.setdefault(key, set())
+            if medical_id is not None and str(medical_id).strip() not in ("", "nan"):
+                ids.add(str(medical_id).strip())
+
+        self.keys = sorted(ids_by_key)
+        self.names = [display[k] for k in self.keys]
+        self.medical_ids = [ids_by_key[k] for k in self.keys]
+        self.grams = [trigrams(k) for k in self.keys]
+
+        # (word, position) pairs sorted by word, for prefix search on any word
+        self.words = sorted(
+            (word, position) for position, key in enumerate(self.keys) for word in set(key.split())
+        )
+        self._word_keys = [word for word, _ in self.words]
+
+        postings = {}
+        for position, grams in enumerate(self.grams):
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        self.postings = postings
+        self.built_at = time.time()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _prefix_positions(self, sorted_keys, query, limit):
+        start = bisect.bisect_left(sorted_keys, query)
+        end = bisect.bisect_left(sorted_keys, query + "\uffff", lo=start)
+        return range(start, min(end, start + limit))
+
+    def search(self, query, k=10):
+        """Top-`k` matches for `query` as dicts with name, score and medical_id_count."""
+        query = normalize(query)
+        if not query or not self.keys:
+            return []
+        query_grams = trigrams(query)
+
+        # Bound the work per keystroke: short prefixes match many names
+        scan_limit = max(50 * k, 500)
+        bonus = {}
+        for position in self._prefix_positions(self.keys, query, scan_limit):
+            bonus[position] = NAME_PREFIX_BONUS
+        for i in self._prefix_positions(self._word_keys, query, scan_limit):
+            position = self.words[i][1]
+            bonus.setdefault(position, WORD_PREFIX_BONUS)
+
+        # Fuzzy candidates come from the rarest trigrams first, within a fixed
+        # budget, so a query made of common trigrams cannot scan the whole index
+        candidates = set(bonus)
+        if len(query) >= 3:
+            budget = max(100 * k, 5000)
+            for gram in sorted(query_grams, key=lambda g: len(self.postings.get(g, ()))):
+                posting = self.postings.get(gram, ())
+                if len(candidates) + len(posting) > budget and len(candidates) > len(bonus):
+                    break
+                candidates.update(posting[:budget])
+
+        scored = []
+        for position in candidates:
+            common = len(query_grams & self.grams[position])
+            similarity = common / (len(query_grams) + len(self.grams[position]) - common)
+            if position not in bonus and similarity < MIN_SIMILARITY:
+                continue
+            scored.append((similarity + bonus.get(position, 0.0), position))
+
+        return [
+            {
+                "name": self.names[position],
+                "score": round(score, 4),
+                "medical_id_count": len(self.medical_ids[position]),
+            }
+            for score, position in heapq.nlargest(k, scored, key=lambda item: (item[0], -item[1]))
+        ]
+
+
+def _plain(value):
+    return None if value is None else str(value)
+
+
+class SearchIndexService:
+    """
+    Holds the current NameIndex and rebuilds it from `loader()` (an iterable
+    of (name, medical_id) pairs) on a background thread every
+    `refresh_interval` seconds. Searches always read the last complete index;
+    a rebuild swaps it in atomically.
+
+    With a `shared_path`, worker processes share one copy of the entries:
+    whichever process finds the file older than `refresh_interval` rebuilds
+    it under a file lock, and the others load the file whenever it changes,
+    so the sources are queried once per interval rather than once per worker.
+    The file lists every youth's name and Medical ID, so it is written with
+    owner-only permissions (and its directory created owner-only).
+    """
+
+    def __init__(self, loader, refresh_interval=300.0, shared_path=None, lock_timeout=None):
+        self._loader = loader
+        self.refresh_interval = refresh_interval
+        self.shared_path = shared_path
+        self.lock_timeout = refresh_interval if lock_timeout is None else lock_timeout
+        self._shared_signature = None
+        self._index = NameIndex([])
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_refresh_seconds = None
+        self.last_error = None
+
+    def _fresh_signature(self):
+        """(mtime_ns, size) of the shared file if it is younger than refresh_interval, else None."""
+        try:
+            stat = os.stat(self.shared_path)
+        except FileNotFoundError:
+            return None
+        if time.time() - stat.st_mtime >= self.refresh_interval:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _shared_entries(self):
+        """Entries from the shared file, rebuilding it if stale; None if it is unchanged."""
+        signature = self._fresh_signature()
+        if signature is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.shared_path)), mode=0o700, exist_ok=True)
+            with file_lock(f"{self.shared_path}.lock", timeout=self.lock_timeout):
+                # Another worker may have rebuilt it while we waited
+                signature = self._fresh_signature()
+                if signature is None:
+                    entries = [(_plain(name), _plain(mid)) for name, mid in self._loader()]
+                    tmp_path = f"{self.shared_path}.{os.getpid()}.tmp"
+                    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                    with open(fd, "w", encoding="utf-8") as f:
+                        json.dump(entries, f)
+                    os.replace(tmp_path, self.shared_path)
+                    self._shared_signature = self._fresh_signature()
+                    return entries
+        if signature == self._shared_signature:
+            return None
+        with open(self.shared_path, encoding="utf-8") as f:
+            entries = json.load(f)
+        self._shared_signature = signature
+        return entries
+
+    def refresh(self):
+        with self._refresh_lock:
+            started = time.perf_counter()
+            try:
+                entries = self._shared_entries() if self.shared_path else self._loader()
+                if entries is None:
+                    return True  # the shared copy has not changed
+                index = NameIndex(entries)
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"⚠️ Search index refresh failed: {e}")
+                return False
+            self._index = index
+            self.last_refresh_seconds = round(time.perf_counter() - started, 3)
+            self.last_error = None
+            logger.info(f"✅ Search index built: {len(index)} names in {self.last_refresh_seconds}s")
+            return True
+
+    def _loop(self):
+        self.refresh()
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def start(self):
+        """Build the index in the background and keep refreshing it."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="search-index", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def search(self, query, k=10):
+        return self._index.search(query, k)
+
+    def info(self):
+        index = self._index
+        return {
+            "names": len(index),
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(index.built_at)) if len(index) else None,
+            "last_refresh_seconds": self.last_refresh_seconds,
+            "shared_path": self.shared_path,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,54 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls: while a call for `key` is running,
+    other callers with the same key wait for its result (or exception)
+    instead of starting their own. Once it finishes the key is forgotten, so
+    a later call always runs fresh; nothing is cached beyond the call itself.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._calls = 0
+        self._executed = 0
+        self._collapsed = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            self._calls += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self._executed += 1
+            else:
+                self._collapsed += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "executed": self._executed,
+                "collapsed": self._collapsed,
+                "in_flight": len(self._in_flight),
+            }
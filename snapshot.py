@@ -0,0 +1,156 @@
+import argparse
+import os
+import threading
+import time
+
+import pandas as pd
+
+SNAPSHOT_PATH = os.environ.get("SNAPSHOT_PATH", "data/serrano_snapshot.arrow")
+
+# Column listing which sources contributed to a youth's merged record
+SOURCES_COLUMN = "_sources"
+
+
+def _cell(value):
+    """Store every value as a string (or null) so mixed-type fields fit one Arrow column."""
+    if value is None:
+        return None
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return str(value)
+
+
+def build_snapshot(path=SNAPSHOT_PATH):
+    """
+    Materialize the merged per-youth records from Excel, Cloud SQL, and
+    BigQuery into an Arrow IPC file at `path`. Records are normalized and
+    merged exactly as the report generators do. Returns the row count.
+    """
+    import pyarrow as pa
+    from src.reentry_care_plan import (
+        get_roster, read_cloud_sql_all, read_bigquery_all, normalize_columns,
+        merge_source_records, _records_by_medical_id,
+    )
+
+    started = time.perf_counter()
+    source_rows = {
+        "excel": _records_by_medical_id(get_roster()),
+        "sql": _records_by_medical_id(normalize_columns(read_cloud_sql_all())),
+        "bigquery": _records_by_medical_id(normalize_columns(read_bigquery_all())),
+    }
+    medical_ids = list(dict.fromkeys(
+        mid for rows in source_rows.values() for mid in rows
+    ))
+
+    records = []
+    for mid in medical_ids:
+        per_source = {name: rows.get(mid, {}) for name, rows in source_rows.items()}
+        merged = merge_source_records(per_source, mid)
+        record = {k.strip(): _cell(v) for k, v in merged.items()}
+        record[SOURCES_COLUMN] = ",".join(name for name, row in per_source.items() if row)
+        records.append(record)
+
+    columns = list(dict.fromkeys(k for record in records for k in record))
+    table = pa.Table.from_pylist(
+        records, schema=pa.schema([(c, pa.string()) for c in columns])
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    print(f"✅ Snapshot of {table.num_rows} youths written to {path} "
+          f"in {time.perf_counter() - started:.1f}s")
+    return table.num_rows
+
+
+class SnapshotStore:
+    """
+    Memory-maps the Arrow snapshot and indexes it by Medical ID and
+    normalized name. Re-opens the file when it is replaced on disk.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH, name_key=None):
+        self.path = path
+        self._name_key = name_key or (lambda name: " ".join(str(name).split()).casefold())
+        self._lock = threading.Lock()
+        self._state = None
+
+    def _load(self):
+        import pyarrow as pa
+
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        state = self._state
+        if state is not None and state[0] == signature:
+            return state
+        with self._lock:
+            state = self._state
+            if state is None or state[0] != signature:
+                table = pa.ipc.open_file(pa.memory_map(self.path, "r")).read_all()
+                by_id, by_name = {}, {}
+                if "Medical ID Number" in table.column_names:
+                    for pos, mid in enumerate(table.column("Medical ID Number").to_pylist()):
+                        if mid is not None:
+                            by_id.setdefault(mid.strip(), pos)
+                if "Name of the youth" in table.column_names:
+                    for pos, name in enumerate(table.column("Name of the youth").to_pylist()):
+                        if name is not None:
+                            by_name.setdefault(self._name_key(name), []).append(pos)
+                state = (signature, table, by_id, by_name)
+                self._state = state
+            return state
+
+    def available(self):
+        return os.path.exists(self.path)
+
+    @staticmethod
+    def _row(table, pos):
+        row = table.slice(pos, 1).to_pylist()[0]
+        row.pop(SOURCES_COLUMN, None)
+        return {k: v for k, v in row.items() if v is not None}
+
+    def get(self, medical_id) -> dict:
+        """Merged record for a Medical ID, or {} when it is not in the snapshot."""
+        _, table, by_id, _ = self._load()
+        pos = by_id.get(str(medical_id).strip())
+        return self._row(table, pos) if pos is not None else {}
+
+    def find_by_name(self, name) -> list:
+        """Merged records whose normalized name matches `name`."""
+        _, table, _, by_name = self._load()
+        return [self._row(table, pos) for pos in by_name.get(self._name_key(name), [])]
+
+    def info(self):
+        signature, table, by_id, _ = self._load()
+        return {
+            "path": self.path,
+            "rows": table.num_rows,
+            "columns": table.num_columns,
+            "medical_ids": len(by_id),
+            "modified": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(signature[0] / 1e9)),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.snapshot",
+        description="Build or inspect the local Arrow snapshot of merged youth records.",
+    )
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--path", default=SNAPSHOT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        build_snapshot(args.path)
+    else:
+        print(SnapshotStore(args.path).info())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Spans recorded during the current request, for the Server-Timing header.
+# The list is shared (not copied) by contexts copied into worker threads, so
+# spans from the parallel source fetches land in the same request.
+_request_spans = contextvars.ContextVar("request_spans", default=None)
+
+
+class Histogram:
+    """Cumulative latency histogram in the Prometheus sense, one series per label value."""
+
+    def __init__(self, name, help_text, label, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, seconds):
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            position = bisect.bisect_left(self.buckets, seconds)
+            if position < len(counts):
+                counts[position] += 1
+            series[1] += 1
+            series[2] += seconds
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: (list(v[0]), v[1], v[2]) for k, v in self._series.items()}
+        for label_value, (counts, count, total) in sorted(series.items()):
+            label = f'{self.label}="{_escape_label(label_value)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{label}}} {count}")
+        return "\n".join(lines)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+stage_latency = Histogram(
+    "serrano_stage_duration_seconds", "Time spent in one stage of a request.", "stage"
+)
+request_latency = Histogram(
+    "serrano_request_duration_seconds", "Time to produce a response, by endpoint.", "endpoint"
+)
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block as stage `name`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        stage_latency.observe(name, elapsed)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((name, elapsed))
+
+
+def traced(name):
+    """Decorator form of `span()`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_request():
+    """Begin collecting spans for the current request."""
+    _request_spans.set([])
+
+
+def request_spans():
+    """(stage, seconds) spans recorded so far in this request."""
+    return list(_request_spans.get() or [])
+
+
+def server_timing(spans):
+    """Server-Timing header value; repeated stages are summed."""
+    totals = {}
+    for name, seconds in spans:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items())
+
+
+def submit_with_context(executor, fn, *args, **kwargs):
+    """`executor.submit` that runs `fn` in a copy of the caller's context."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def render_metrics():
+    """All histograms in Prometheus text exposition format."""
+    return "\n".join(h.render() for h in (stage_latency, request_latency)) + "\n"